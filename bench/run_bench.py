@@ -0,0 +1,204 @@
+"""Reproducible offline benchmark for the detection pipeline.
+
+Runs detect() end to end against local stub search/article servers at several
+concurrency levels, plus microbenchmarks for the hot functions, and reports
+throughput, p50/p95/p99 latency and peak RSS. Results can be saved as a JSON
+baseline and compared against a previous run:
+
+    python bench/run_bench.py --save bench/baseline.json
+    python bench/run_bench.py --compare bench/baseline.json
+
+Run from the repository root (the classifier loads models/ relative to it).
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stubs import StubNewsServer, StubArticleServer, PAGES_DIR
+
+CLAIM_TEMPLATES = [
+    "City council approves {n} million dollar funding for new downtown park",
+    "NASA confirms alien life discovered on Mars in sample {n}",
+    "SHOCKING: central bank secretly raises interest rates by {n} percent!!!",
+    "Mayor announces park construction will begin next spring, costing {n} million",
+    "You won't believe what happened next at council meeting number {n}",
+    "Inflation falls to {n} percent as central bank holds rates steady",
+]
+
+def make_claims(count, seed):
+    rng = random.Random(seed)
+    return [rng.choice(CLAIM_TEMPLATES).format(n=rng.randrange(1, 10**6)) for _ in range(count)]
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def latency_stats(latencies, wall):
+    lat = np.asarray(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "throughput_rps": len(latencies) / wall if wall else 0.0,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p95_ms": float(np.percentile(lat, 95)),
+        "p99_ms": float(np.percentile(lat, 99)),
+        "mean_ms": float(lat.mean()),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def timeit_call(fn, repeat, number):
+    """Best-of-repeat per-call time in microseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number): fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1e6
+
+# ----------------- END TO END --------------------
+def bench_end_to_end(detector, concurrency_levels, claims_per_level, max_sources, seed):
+    results = {}
+    for level in concurrency_levels:
+        claims = make_claims(claims_per_level, seed + level)
+        latencies = []
+
+        def run(claim):
+            start = time.perf_counter()
+            detector.detect(claim, max_sources=max_sources)
+            return time.perf_counter() - start
+
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as pool:
+            latencies = list(pool.map(run, claims))
+        results[f"concurrency_{level}"] = latency_stats(latencies, time.perf_counter() - wall_start)
+    return results
+
+# ----------------- MICRO --------------------
+def bench_micro(detector, repeat, number):
+    with open(os.path.join(PAGES_DIR, sorted(os.listdir(PAGES_DIR))[0]), encoding="utf-8") as f:
+        html = f.read()
+    article = detector.parser._extract_paragraphs(html.encode())
+    claim = CLAIM_TEMPLATES[0].format(n=10)
+    style_result = detector.classifier.analyze_style(claim)
+    evidence = [{
+        "source": f"Outlet {i}", "url": f"http://example.invalid/{i}", "published": "",
+        "reliability": 0.6 + 0.05 * (i % 8), "verdict": "supports" if i % 3 else "refutes",
+        "confidence": 0.8, "similarity": 0.7, "snippet": "snippet"} for i in range(10)]
+
+    # verify() is measured warm: the embedding cache makes repeat calls nearly free,
+    # so encode cost is measured separately on the uncached path
+    sentences = detector.verifier.split_sentences(article)
+    return {
+        "extract_paragraphs_us": timeit_call(lambda: detector.parser._extract_paragraphs(html.encode()), repeat, max(1, number // 10)),
+        "extract_features_us": timeit_call(lambda: detector.classifier._extract_features(claim), repeat, number),
+        "analyze_style_us": timeit_call(lambda: detector.classifier.analyze_style(claim), repeat, number),
+        "verify_us": timeit_call(lambda: detector.verifier.verify(claim, article), repeat, max(1, number // 10)),
+        "encode_uncached_us": timeit_call(lambda: detector.verifier._encode_uncached(sentences), repeat, max(1, number // 100)),
+        "score_us": timeit_call(lambda: detector.scorer.score(claim, style_result, evidence), repeat, number),
+    }
+
+# ----------------- BASELINES --------------------
+def compare(current, baseline, tolerance):
+    """Print per-metric deltas; return the list of regressions beyond tolerance"""
+    regressions = []
+    lower_is_better = ("_ms", "_us", "_mb")
+
+    def walk(cur, base, path):
+        for key, value in cur.items():
+            if key not in base: continue
+            if isinstance(value, dict):
+                walk(value, base[key], f"{path}{key}."); continue
+            if not isinstance(value, (int, float)) or not base[key]: continue
+            if not key.endswith(lower_is_better + ("_rps",)): continue
+            change = (value - base[key]) / base[key]
+            worse = change > tolerance if key.endswith(lower_is_better) else change < -tolerance
+            flag = "  REGRESSION" if worse else ""
+            print(f"  {path}{key:<22} {base[key]:>12.2f} -> {value:>12.2f} ({change:+.1%}){flag}")
+            if worse: regressions.append(f"{path}{key}")
+
+    walk(current["results"], baseline["results"], "")
+    return regressions
+
+def main():
+    args = argparse.ArgumentParser(description="Offline pipeline benchmark")
+    args.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    args.add_argument("--claims", type=int, default=40, help="detect() calls per concurrency level")
+    args.add_argument("--max-sources", type=int, default=10)
+    args.add_argument("--search-latency", type=float, default=0.05, help="stub search API latency (s)")
+    args.add_argument("--article-latency", type=float, default=0.1, help="stub article site latency (s)")
+    args.add_argument("--article-hosts", type=int, default=8, help="number of distinct stub article hosts")
+    args.add_argument("--jitter", type=float, default=0.02)
+    args.add_argument("--failure-rate", type=float, default=0.05, help="fraction of stub requests that fail")
+    args.add_argument("--repeat", type=int, default=5)
+    args.add_argument("--number", type=int, default=200)
+    args.add_argument("--seed", type=int, default=1234)
+    args.add_argument("--early-exit", action="store_true", help="stop fetching once the verdict is settled")
+    args.add_argument("--processes", type=int, default=0, help="offload parsing/embedding to this many processes")
+    args.add_argument("--embedding-backend", default="torch", help="torch, torch-int8, onnx-int8 or onnx")
+    args.add_argument("--skip-e2e", action="store_true")
+    args.add_argument("--skip-micro", action="store_true")
+    args.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    args.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    args.add_argument("--tolerance", type=float, default=0.10, help="allowed relative slowdown before flagging")
+    args = args.parse_args()
+
+    articles = [StubArticleServer(latency=args.article_latency, jitter=args.jitter,
+                                  failure_rate=args.failure_rate, seed=args.seed + i).start()
+                for i in range(args.article_hosts)]
+    news = StubNewsServer([server.url for server in articles], latency=args.search_latency, jitter=args.jitter,
+                          failure_rate=args.failure_rate, seed=args.seed - 1).start()
+
+    from detector import HybridFakeNewsDetector
+    with contextlib.redirect_stdout(sys.stderr):
+        detector = HybridFakeNewsDetector(api_keys={"gnews": "bench", "newsapi": "bench", "bing": "bench"},
+                                          search_endpoints=news.endpoints(), early_exit=args.early_exit,
+                                          processes=args.processes, embedding_backend=args.embedding_backend)
+        startup = detector.warmup()
+
+    results = {"startup_s": startup}
+    try:
+        if not args.skip_micro:
+            results["micro"] = bench_micro(detector, args.repeat, args.number)
+        if not args.skip_e2e:
+            results["end_to_end"] = bench_end_to_end(detector, args.concurrency, args.claims, args.max_sources, args.seed)
+    finally:
+        news.stop()
+        for server in articles: server.stop()
+
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k not in ("save", "compare")},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count()},
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.save:
+        with open(args.save, "w") as f: json.dump(report, f, indent=2)
+        print(f"✓ Baseline saved to {args.save}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f: baseline = json.load(f)
+        print(f"\nComparison against {args.compare}:", file=sys.stderr)
+        with contextlib.redirect_stdout(sys.stderr):
+            regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"✗ {len(regressions)} regression(s) beyond {args.tolerance:.0%}", file=sys.stderr)
+            sys.exit(1)
+        print("✓ No regressions", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
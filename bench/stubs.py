@@ -0,0 +1,126 @@
+"""Local stand-ins for the news search APIs and for article sites.
+
+StubNewsServer answers /gnews, /newsapi and /bing with the same JSON shapes the real
+providers return; article URLs are spread over several StubArticleServers (one per
+port, so each counts as a separate host for per-host limits), which serve recorded
+HTML from bench/pages with configurable latency and failure rate.
+"""
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+PAGES_DIR = os.path.join(os.path.dirname(__file__), "pages")
+OUTLETS = ["Reuters", "Associated Press", "BBC News", "NPR", "CNN", "Fox News", "The Daily Blog", "Local Times"]
+
+class _StubServer:
+    def __init__(self, handler, latency=0.0, jitter=0.0, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.daemon_threads = True
+        self.httpd.stub = self
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def delay_and_fail(self):
+        """Sleep for the configured latency; return True if this request should fail"""
+        with self._rng_lock:
+            delay = max(0.0, self.rng.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+            fail = self.rng.random() < self.failure_rate
+        if delay: time.sleep(delay)
+        return fail
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args): pass
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class _NewsHandler(_Handler):
+    def do_GET(self):
+        stub = self.server.stub
+        if stub.delay_and_fail():
+            return self._send(500, b'{"errors":["stub failure"]}', "application/json")
+
+        path = urlparse(self.path)
+        params = parse_qs(path.query)
+        query = params.get("q", [""])[0]
+        limit = int((params.get("max") or params.get("pageSize") or params.get("count") or ["10"])[0])
+        articles = stub.articles(query, limit)
+
+        if path.path == "/gnews":
+            body = {"totalArticles": len(articles), "articles": [
+                {"title": a["title"], "description": a["title"], "content": "", "url": a["url"],
+                 "publishedAt": a["published"], "source": {"name": a["source"], "url": ""}} for a in articles]}
+        elif path.path == "/newsapi":
+            body = {"status": "ok", "totalResults": len(articles), "articles": [
+                {"title": a["title"], "description": a["title"], "content": "", "url": a["url"],
+                 "publishedAt": a["published"], "source": {"id": None, "name": a["source"]}} for a in articles]}
+        elif path.path == "/bing":
+            body = {"value": [
+                {"name": a["title"], "description": a["title"], "url": a["url"],
+                 "datePublished": a["published"], "provider": [{"name": a["source"]}]} for a in articles]}
+        else:
+            return self._send(404, b"{}", "application/json")
+        self._send(200, json.dumps(body).encode(), "application/json")
+
+class StubNewsServer(_StubServer):
+    """GNews/NewsAPI/Bing-compatible search endpoints with deterministic results per query"""
+
+    def __init__(self, article_urls, **kwargs):
+        super().__init__(_NewsHandler, **kwargs)
+        self.article_urls = article_urls
+
+    def endpoints(self):
+        return {"gnews": f"{self.url}/gnews", "newsapi": f"{self.url}/newsapi", "bing": f"{self.url}/bing"}
+
+    def articles(self, query, limit):
+        seed = int(hashlib.md5(query.encode()).hexdigest()[:8], 16)
+        rng = random.Random(seed)
+        return [{
+            "title": f"{query[:60]} ({i})",
+            "url": f"{rng.choice(self.article_urls)}/article/{rng.randrange(10**6)}",
+            "source": rng.choice(OUTLETS),
+            "published": "2024-01-01T00:00:00Z",
+        } for i in range(limit)]
+
+class _ArticleHandler(_Handler):
+    def do_GET(self):
+        stub = self.server.stub
+        if stub.delay_and_fail():
+            return self._send(503, b"<html><body>Service unavailable</body></html>", "text/html")
+        page = stub.pages[int(hashlib.md5(self.path.encode()).hexdigest()[:8], 16) % len(stub.pages)]
+        self._send(200, page, "text/html; charset=utf-8")
+
+class StubArticleServer(_StubServer):
+    """Serves recorded HTML pages (bench/pages/*.html), chosen deterministically per URL"""
+
+    def __init__(self, pages_dir=PAGES_DIR, **kwargs):
+        super().__init__(_ArticleHandler, **kwargs)
+        self.pages = []
+        for name in sorted(os.listdir(pages_dir)):
+            if name.endswith(".html"):
+                with open(os.path.join(pages_dir, name), "rb") as f: self.pages.append(f.read())
+        if not self.pages: raise FileNotFoundError(f"No .html pages in {pages_dir}")
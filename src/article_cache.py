@@ -0,0 +1,70 @@
+import os
+import time
+import sqlite3
+import threading
+
+class ArticleCache:
+    """Persistent store of parsed articles keyed by URL, with TTL and negative caching.
+
+    Stale entries are kept for `retain` seconds so they can be revalidated with a conditional GET.
+    On open and every `purge_every` puts, entries older than that are dropped and the table is trimmed to
+    `max_entries` rows, oldest first.
+    """
+
+    def __init__(self, path="cache/articles.sqlite3", ttl=6*3600, negative_ttl=600, retain=7*86400,
+                 max_entries=100000, purge_every=1000):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.retain = retain
+        self.max_entries = max_entries
+        self.purge_every = purge_every
+        self._puts = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                "url TEXT PRIMARY KEY, text TEXT, parser TEXT, fetched_at REAL, "
+                "etag TEXT, last_modified TEXT, status TEXT)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS articles_fetched_at ON articles (fetched_at)")
+        self.purge()
+
+    def get(self, url):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, parser, fetched_at, etag, last_modified, status FROM articles WHERE url=?", (url,)
+            ).fetchone()
+        if row is None: return None
+        entry = dict(zip(("text", "parser", "fetched_at", "etag", "last_modified", "status"), row))
+        ttl = self.negative_ttl if entry["status"] == "failed" else self.ttl
+        entry["fresh"] = time.time() - entry["fetched_at"] < ttl
+        return entry
+
+    def put(self, url, text, parser, etag=None, last_modified=None):
+        status = "ok" if text else "failed"
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, text, parser, time.time(), etag, last_modified, status)
+            )
+            self._puts += 1
+            due = self._puts % self.purge_every == 0
+        if due: self.purge()
+
+    def touch(self, url):
+        """Mark an entry as revalidated (e.g. after a 304 Not Modified)"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE articles SET fetched_at=? WHERE url=?", (time.time(), url))
+
+    def purge(self):
+        """Drop entries past the retention window, then the oldest rows beyond max_entries"""
+        cutoff = time.time() - max(self.retain, self.ttl, self.negative_ttl)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM articles WHERE fetched_at < ?", (cutoff,))
+            excess = self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._conn.execute("DELETE FROM articles WHERE url IN "
+                                   "(SELECT url FROM articles ORDER BY fetched_at LIMIT ?)", (excess,))
@@ -1,14 +1,37 @@
 import os
+import re
 import pickle
+import hashlib
 import numpy as np
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.svm import LinearSVC
+from compact_model import CompactTextModel, export_compact_model, compact_path_for, is_current
+
+SENSATIONAL_WORDS = [
+    'shocking','unbelievable','breaking','urgent','exposed',
+    'secret','truth','conspiracy','hidden','revealed'
+]
+EMOTIONAL_WORDS = ['fear','panic','crisis','disaster','dangerous','deadly']
+CLICKBAIT_PATTERNS = [
+    r"you won'?t believe", r"this will \w+ your \w+", r"one simple trick",
+    r"doctors hate", r"click to find out", r"what happened next"
+]
+FEATURE_NAMES = ['sensational_count','clickbait_count','caps_ratio','exclamation_count','emotional_count','manual_score']
+
+CLICKBAIT_RES = [re.compile(p) for p in CLICKBAIT_PATTERNS]
 
 class FakeNewsClassifier:
 
-    def __init__(self, model_path="models/fake_news_model.pkl"):
+    def __init__(self, model_path="models/fake_news_model.pkl", compact_path=None):
         self.model_path = model_path
+        self.compact = None
+
+        # Prefer the memory-mapped compact artifact (<model>_compact next to the pickle): no sklearn
+        # import, no vocabulary unpickling. It is skipped unless it was exported from this exact pickle
+        compact_path = compact_path or compact_path_for(model_path)
+        if is_current(compact_path, model_path):
+            self.compact = CompactTextModel(compact_path)
+            self.vectorizer = self.classifier = None
+            print("✓ Loaded compact ML classifier")
+            return
 
         if not os.path.exists(self.model_path):
             raise FileNotFoundError(
@@ -25,30 +48,25 @@ class FakeNewsClassifier:
 
         print("✓ Loaded trained ML classifier")
 
-    def _extract_features(self, text):
-        text_lower = text.lower()
-        features = {}
-
-        sensational_words = [
-            'shocking','unbelievable','breaking','urgent','exposed',
-            'secret','truth','conspiracy','hidden','revealed'
-        ]
-        features['sensational_count'] = sum(w in text_lower for w in sensational_words)
-
-        import re
-        patterns = [
-            r"you won'?t believe", r"this will \w+ your \w+", r"one simple trick",
-            r"doctors hate", r"click to find out", r"what happened next"
-        ]
-        features['clickbait_count'] = sum(bool(re.search(p, text_lower)) for p in patterns)
+    def _decision(self, texts):
+        if self.compact is not None:
+            return self.compact.decision_function(texts)
+        return self.classifier.decision_function(self.vectorizer.transform(texts))
 
+    def _raw_features(self, text):
+        text_lower = text.lower()
         words = text.split()
-        caps_words = [w for w in words if w.isupper() and len(w) > 2]
-        features['caps_ratio'] = len(caps_words) / len(words) if words else 0
+        caps_words = sum(1 for w in words if w.isupper() and len(w) > 2)
+        return (
+            sum(w in text_lower for w in SENSATIONAL_WORDS),
+            sum(bool(p.search(text_lower)) for p in CLICKBAIT_RES),
+            caps_words / len(words) if words else 0,
+            text.count('!'),
+            sum(w in text_lower for w in EMOTIONAL_WORDS),
+        )
 
-        features['exclamation_count'] = text.count('!')
-        emotional_words = ['fear','panic','crisis','disaster','dangerous','deadly']
-        features['emotional_count'] = sum(w in text_lower for w in emotional_words)
+    def _extract_features(self, text):
+        features = dict(zip(FEATURE_NAMES, self._raw_features(text)))
 
         manual_score = (
             features['sensational_count'] * 0.15 +
@@ -65,8 +83,7 @@ class FakeNewsClassifier:
         features = self._extract_features(text)
 
         try:
-            X_vec = self.vectorizer.transform([text])
-            decision = self.classifier.decision_function(X_vec)[0]
+            decision = self._decision([text])[0]
             style_score = 1 / (1 + np.exp(-decision))
         except:
             style_score = features["manual_score"]
@@ -77,9 +94,220 @@ class FakeNewsClassifier:
             "features": features
         }
 
+    def analyze_style_batch(self, texts, as_arrays=False):
+        """Style analysis for many texts with a single transform/decision_function call.
+
+        Returns one dict per text (same shape as analyze_style), or with as_arrays=True
+        {"style_score": (N,), "features": (N, len(FEATURE_NAMES)), "feature_names": FEATURE_NAMES}.
+        """
+        features = np.array([self._raw_features(t) for t in texts], dtype=np.float64).reshape(len(texts), 5)
+        manual_scores = np.minimum(
+            features[:, 0] * 0.15 +
+            features[:, 1] * 0.25 +
+            features[:, 2] * 0.20 +
+            np.minimum(features[:, 3], 3) * 0.10 +
+            features[:, 4] * 0.10, 1.0)
+
+        try:
+            decisions = self._decision(texts)
+            style_scores = 1 / (1 + np.exp(-decisions))
+        except:
+            style_scores = manual_scores
+
+        if as_arrays:
+            return {
+                "style_score": np.asarray(style_scores, dtype=np.float64),
+                "features": np.column_stack([features, manual_scores]),
+                "feature_names": list(FEATURE_NAMES)
+            }
+
+        return [{
+            "style_score": float(score),
+            "confidence": 0.7,
+            "features": {
+                'sensational_count': int(row[0]),
+                'clickbait_count': int(row[1]),
+                'caps_ratio': float(row[2]),
+                'exclamation_count': int(row[3]),
+                'emotional_count': int(row[4]),
+                'manual_score': float(manual)
+            }
+        } for score, row, manual in zip(style_scores, features, manual_scores)]
+
 
 # TRAINING MODE
+# ----------------- STREAMING TRAINING --------------------
+LABELS = {"1": 1, "0": 0, "fake": 1, "false": 1, "true": 0, "real": 0}
+
+def _file_chunks(path, chunksize):
+    import json
+    from itertools import islice
+    import pandas as pd
+    fixed = None
+    if re.search(r":\w+$", path) and not os.path.exists(path):
+        path, fixed = path.rsplit(":", 1)
+    name = os.path.basename(path).lower()
+    if fixed is None and name in ("fake.csv", "true.csv"): fixed = "1" if name == "fake.csv" else "0"
+
+    if path.endswith((".jsonl", ".json")):
+        with open(path, encoding="utf-8") as f:
+            while True:
+                records = [json.loads(line) for line in islice(f, chunksize) if line.strip()]
+                if not records: break
+                yield ([str(r.get("text") or "") for r in records],
+                       [LABELS[str(fixed if fixed is not None else r["label"]).lower()] for r in records])
+    else:
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            texts = chunk["text"].fillna("").astype(str).tolist()
+            labels = [LABELS[str(fixed).lower()]] * len(texts) if fixed is not None else \
+                     [LABELS[str(label).lower()] for label in chunk["label"]]
+            yield texts, labels
+
+def iter_labelled_chunks(paths, chunksize=10000, seed=42):
+    """Yield shuffled (texts, labels) chunks from CSV/JSONL files without loading them whole.
+
+    A path may end in ":<label>" (e.g. data/Fake.csv:1) to label every row; otherwise rows
+    need a "label" column/key (1/0 or fake/true/real). Fake.csv and True.csv are labelled
+    automatically. Files are read round-robin, an equal share of each chunk from every file
+    that still has rows, and each chunk is shuffled, so SGD never sees one class at a time.
+    """
+    rng = np.random.default_rng(seed)
+    readers = [_file_chunks(path, max(1, chunksize // len(paths))) for path in paths]
+    while readers:
+        texts, labels, active = [], [], []
+        for reader in readers:
+            part = next(reader, None)
+            if part is None: continue
+            texts += part[0]; labels += part[1]
+            active.append(reader)
+        readers = active
+        if not texts: break
+        order = rng.permutation(len(texts))
+        yield [texts[i] for i in order], [labels[i] for i in order]
+
+def _is_holdout(text, eval_percent):
+    # Content hash, so the split is stable across epochs, runs and --update
+    if not eval_percent: return False
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=4).digest(), "little") % 100 < eval_percent
+
+def _vectorize_chunk(texts, labels, vectorizer, eval_percent, holdout):
+    """Hash the chunk's training rows (holdout=False) or holdout rows (runs in worker processes)"""
+    keep = [_is_holdout(t, eval_percent) == holdout for t in texts]
+    part_texts = [t for t, k in zip(texts, keep) if k]
+    part_labels = np.array([l for l, k in zip(labels, keep) if k], dtype=np.int64)
+    return vectorizer.transform(part_texts) if part_texts else None, part_labels
+
+def _pipelined(pool, fn, chunks, depth, *args):
+    """pool.map over (texts, labels) chunks with at most `depth` in flight, so memory stays bounded"""
+    from collections import deque
+    pending = deque()
+    for texts, labels in chunks:
+        pending.append(pool.submit(fn, texts, labels, *args))
+        if len(pending) >= depth: yield pending.popleft().result()
+    while pending: yield pending.popleft().result()
+
+def train_streaming(paths, model_path="models/fake_news_model.pkl", update=False, chunksize=10000, epochs=1,
+                    eval_percent=10, jobs=None, n_features=2**20):
+    """Out-of-core training: HashingVectorizer + SGDClassifier.partial_fit over chunked input.
+
+    Hashing needs no vocabulary pass, so each chunk is vectorized independently across `jobs`
+    processes while the model trains on the previous ones. Rows whose content hash falls in the
+    `eval_percent` bucket are held out, then re-read and scored by the final model in a second pass. With update=True an existing
+    streaming model keeps training on the new data.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from sklearn.feature_extraction.text import HashingVectorizer
+    from sklearn.linear_model import SGDClassifier
+
+    if update:
+        with open(model_path, "rb") as f:
+            saved = pickle.load(f)
+        if not hasattr(saved["classifier"], "partial_fit") or not isinstance(saved["vectorizer"], HashingVectorizer):
+            raise ValueError(f"{model_path} is not a streaming model; train one with --streaming first")
+        vectorizer, clf = saved["vectorizer"], saved["classifier"]
+        class_counts = np.array(saved.get("class_counts", [0, 0]), dtype=np.int64)
+        print(f"Updating {model_path} (trained on {class_counts.sum()} rows so far)")
+    else:
+        vectorizer = HashingVectorizer(n_features=n_features, ngram_range=(1,3), stop_words="english",
+                                       alternate_sign=False, norm="l2")
+        clf = SGDClassifier(loss="hinge", alpha=1e-6, random_state=42)
+        class_counts = np.zeros(2, dtype=np.int64)
+
+    jobs = jobs or os.cpu_count() or 1
+    holdout_counts = np.zeros((2, 2), dtype=np.int64)  # [true label, predicted label]
+    with ProcessPoolExecutor(jobs, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for epoch in range(epochs):
+            rows = 0
+            chunks = iter_labelled_chunks(paths, chunksize, seed=42 + epoch)
+            for X, y in _pipelined(pool, _vectorize_chunk, chunks, 2 * jobs, vectorizer, eval_percent, False):
+                if X is None: continue
+                if epoch == 0: class_counts += np.bincount(y, minlength=2)
+                # "balanced" weights from the class counts seen so far
+                weights = (class_counts.sum() / (2.0 * np.maximum(class_counts, 1)))[y]
+                clf.partial_fit(X, y, classes=np.array([0, 1]), sample_weight=weights)
+                rows += len(y)
+            print(f"  epoch {epoch + 1}/{epochs}: {rows} training rows")
+
+        # Score the holdout with the finished model only
+        if eval_percent:
+            for X, y in _pipelined(pool, _vectorize_chunk, iter_labelled_chunks(paths, chunksize), 2 * jobs,
+                                   vectorizer, eval_percent, True):
+                if X is not None: np.add.at(holdout_counts, (y, clf.predict(X)), 1)
+
+    os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
+    with open(model_path, "wb") as f:
+        pickle.dump({"vectorizer": vectorizer, "classifier": clf, "class_counts": class_counts.tolist()}, f)
+
+    (tn, fp), (fn, tp) = holdout_counts
+    total = holdout_counts.sum()
+    return {"holdout_rows": int(total), "accuracy": float((tn + tp) / total) if total else None,
+            "precision": float(tp / (tp + fp)) if tp + fp else None, "recall": float(tp / (tp + fn)) if tp + fn else None}
+
+
 if __name__ == "__main__":
+    import sys
+    import argparse
+
+    args = argparse.ArgumentParser(description="Train the style classifier")
+    args.add_argument("--export-compact", action="store_true", help="re-export the compact artifact from the pickle")
+    args.add_argument("--streaming", action="store_true", help="out-of-core HashingVectorizer + SGD training")
+    args.add_argument("--update", action="store_true", help="keep training an existing streaming model (implies --streaming)")
+    args.add_argument("--data", nargs="+", default=["data/Fake.csv", "data/True.csv"],
+                      help="CSV/JSONL files; append :1 (fake) or :0 (real) to label a whole file")
+    args.add_argument("--model", default="models/fake_news_model.pkl")
+    args.add_argument("--chunksize", type=int, default=10000)
+    args.add_argument("--epochs", type=int, default=1)
+    args.add_argument("--eval-percent", type=int, default=10, help="hash-based holdout share for evaluation")
+    args.add_argument("--jobs", type=int, default=None, help="vectorizer processes (default: all cores)")
+    args = args.parse_args()
+
+    compact_path = compact_path_for(args.model)
+
+    # Re-export the compact artifact from an existing pickle without retraining
+    if args.export_compact:
+        with open(args.model, "rb") as f:
+            saved = pickle.load(f)
+        export_compact_model(saved["vectorizer"], saved["classifier"], compact_path, args.model)
+        print(f"✓ Compact model exported to {compact_path}")
+        sys.exit(0)
+
+    if args.streaming or args.update:
+        print("Training classifier (streaming)...")
+        report = train_streaming(args.data, args.model, update=args.update, chunksize=args.chunksize,
+                                 epochs=args.epochs, eval_percent=args.eval_percent, jobs=args.jobs)
+        print(f"  holdout: {report}")
+        # A hashing model has no vocabulary to export; an older compact artifact no longer matches
+        # the pickle's hash, so FakeNewsClassifier loads the new pickle and ignores it
+        if os.path.isdir(compact_path):
+            print(f"  {compact_path} is now stale and will be ignored")
+        print("✓ Model trained and saved!")
+        sys.exit(0)
+
+    import pandas as pd
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.svm import LinearSVC
+
     # Only used to train once
     print("Training classifier...")
 
@@ -95,8 +323,11 @@ if __name__ == "__main__":
     clf = LinearSVC(class_weight="balanced", max_iter=10000)
     clf.fit(X_vec, y)
 
-    os.makedirs("models", exist_ok=True)
-    with open("models/fake_news_model.pkl", "wb") as f:
+    os.makedirs(os.path.dirname(args.model) or ".", exist_ok=True)
+    with open(args.model, "wb") as f:
         pickle.dump({"vectorizer": vectorizer, "classifier": clf}, f)
 
+    # Fast-start artifact: sorted vocabulary, IDF and coefficients as memory-mappable .npy
+    export_compact_model(vectorizer, clf, compact_path, args.model)
+
     print("✓ Model trained and saved!")
@@ -0,0 +1,105 @@
+import os
+import re
+import json
+import hashlib
+import numpy as np
+
+def compact_path_for(model_path):
+    """Compact artifact directory that belongs to a pickled model: models/x.pkl -> models/x_compact"""
+    return os.path.splitext(model_path)[0] + "_compact"
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""): digest.update(block)
+    return digest.hexdigest()
+
+def is_current(path, model_path):
+    """True if the compact artifact at path was exported from model_path as it is now (or the pickle is gone)"""
+    if not os.path.isdir(path): return False
+    if not os.path.exists(model_path): return True
+    with open(os.path.join(path, "meta.json")) as f:
+        source = json.load(f).get("source_sha256")
+    return source == file_digest(model_path)
+
+class CompactTextModel:
+    """TF-IDF + linear model scored straight from memory-mapped .npy arrays.
+
+    Reproduces TfidfVectorizer(analyzer='word') + decision_function without sklearn or
+    the pickled vocabulary dict, so forked workers share the artifact's pages.
+    """
+
+    def __init__(self, path, mmap_mode="r"):
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.terms = np.load(os.path.join(path, "terms.npy"), mmap_mode=mmap_mode)
+        self.idf = np.load(os.path.join(path, "idf.npy"), mmap_mode=mmap_mode)
+        self.coef = np.load(os.path.join(path, "coef.npy"), mmap_mode=mmap_mode)
+        self.stop_words = frozenset(np.load(os.path.join(path, "stop_words.npy")).tolist())
+        self.intercept = self.meta["intercept"]
+        self.ngram_range = tuple(self.meta["ngram_range"])
+        self._token_re = re.compile(self.meta["token_pattern"])
+
+    def _ngrams(self, text):
+        if self.meta["lowercase"]: text = text.lower()
+        tokens = [t for t in self._token_re.findall(text) if t not in self.stop_words]
+        min_n, max_n = self.ngram_range
+        grams = []
+        for n in range(min_n, min(max_n, len(tokens)) + 1):
+            grams.extend(" ".join(tokens[i:i+n]) for i in range(len(tokens) - n + 1))
+        return grams
+
+    def decision_function(self, texts):
+        grams = [self._ngrams(text) for text in texts]
+        rows = np.repeat(np.arange(len(texts)), [len(g) for g in grams])
+        grams = np.array([g for text_grams in grams for g in text_grams])
+        scores = np.full(len(texts), self.intercept, dtype=np.float64)
+        if not len(grams): return scores
+
+        # One vectorized vocabulary lookup for the whole batch
+        pos = np.minimum(np.searchsorted(self.terms, grams), len(self.terms) - 1)
+        hit = self.terms[pos] == grams
+        keys, counts = np.unique(rows[hit] * len(self.terms) + pos[hit], return_counts=True)
+        rows, cols = np.divmod(keys, len(self.terms))
+
+        tf = counts.astype(np.float64)
+        if self.meta["binary"]: tf[:] = 1.0
+        if self.meta["sublinear_tf"]: tf = np.log(tf) + 1
+        x = tf * self.idf[cols]
+        if self.meta["norm"] == "l2": x /= np.sqrt(np.bincount(rows, x * x, minlength=len(texts)))[rows]
+        elif self.meta["norm"] == "l1": x /= np.bincount(rows, np.abs(x), minlength=len(texts))[rows]
+        return scores + np.bincount(rows, x * self.coef[cols], minlength=len(texts))
+
+def export_compact_model(vectorizer, classifier, path, model_path=None):
+    """Write a fitted TfidfVectorizer + binary linear classifier as a CompactTextModel artifact.
+
+    `model_path` is the pickle the pair was saved to; its hash is recorded so a retrained pickle
+    is never shadowed by this export (see is_current).
+    """
+    params = vectorizer.get_params()
+    if (params["analyzer"] != "word" or params["tokenizer"] or params["preprocessor"]
+            or params["strip_accents"] or not hasattr(vectorizer, "vocabulary_")):
+        raise ValueError("Compact export supports fitted word-analyzer vectorizers with default preprocessing only")
+
+    vocab = vectorizer.vocabulary_
+    terms = sorted(vocab)
+    cols = np.array([vocab[t] for t in terms])
+    idf = vectorizer.idf_[cols] if params["use_idf"] else np.ones(len(terms))
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "terms.npy"), np.array(terms))
+    np.save(os.path.join(path, "idf.npy"), np.ascontiguousarray(idf, dtype=np.float64))
+    np.save(os.path.join(path, "coef.npy"), np.ascontiguousarray(classifier.coef_[0][cols], dtype=np.float64))
+    np.save(os.path.join(path, "stop_words.npy"), np.array(sorted(vectorizer.get_stop_words() or [""])))
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({
+            "lowercase": params["lowercase"],
+            "token_pattern": params["token_pattern"],
+            "ngram_range": list(params["ngram_range"]),
+            "binary": params["binary"],
+            "sublinear_tf": params["sublinear_tf"],
+            "norm": params["norm"],
+            "intercept": float(classifier.intercept_[0]),
+            "classes": [int(c) for c in classifier.classes_],
+            "source_sha256": file_digest(model_path) if model_path else None,
+        }, f, indent=2)
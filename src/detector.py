@@ -1,71 +1,343 @@
+import os
 import re
+import copy
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from classifier import FakeNewsClassifier
 from searcher import MultiSourceSearcher
+from reliability import ReliabilityRegistry
 from parser import ArticleParser
+from article_cache import ArticleCache
 from verifier import RAGNLIVerifier
 from scorer import HybridScorer
 from presenter import EvidencePresenter
+from fetcher import ConcurrentFetcher
+from evidence_store import EvidenceStore
+from verdict_cache import VerdictCache
+from executor import ProcessOffload
+from metrics import Metrics, NULL_METRICS, Trace, current_trace
 from datetime import datetime
 
+def _lazy(name):
+    return property(lambda self: self._component(name))
+
 class HybridFakeNewsDetector:
     """Complete hybrid system"""
 
-    def __init__(self, api_keys=None, dataset_path=None):
+    COMPONENTS = ("offload", "classifier", "searcher", "parser", "fetcher", "verifier", "scorer", "presenter", "evidence")
+
+    classifier = _lazy("classifier")
+    searcher = _lazy("searcher")
+    parser = _lazy("parser")
+    fetcher = _lazy("fetcher")
+    verifier = _lazy("verifier")
+    scorer = _lazy("scorer")
+    presenter = _lazy("presenter")
+    evidence = _lazy("evidence")
+    offload = _lazy("offload")
+
+    def __init__(self, api_keys=None, dataset_path=None, max_workers=8, per_host_limit=2, fetch_deadline=30.0,
+                 cache_dir=None, evidence_store=None, evidence_mode="live", tracing=False, search_endpoints=None, lazy=True,
+                 verdict_ttl=None, verdict_capacity=10000, verdict_threshold=0.8, early_exit=False,
+                 processes=0, torch_threads=None, embedding_backend="torch", reliability_path="data/source_reliability.csv",
+                 search_rate_limits=None, search_cache_ttl=900):
         print("="*70)
         print("INITIALIZING HYBRID FAKE NEWS DETECTOR")
         print("="*70)
         print("Components: ML Classifier + RAG + NLI + Hybrid Scorer\n")
-        self.classifier = FakeNewsClassifier(model_path="models/fake_news_model.pkl")
 
-        
-        self.searcher = MultiSourceSearcher(api_keys)
-        self.parser = ArticleParser()
-        self.verifier = RAGNLIVerifier()
-        self.scorer = HybridScorer()
-        self.presenter = EvidencePresenter()
+        self.api_keys = api_keys
+        self.search_endpoints = search_endpoints
+        # search_rate_limits: provider -> (requests per second, burst), enforced per API key
+        self.search_rate_limits = search_rate_limits
+        self.search_cache_ttl = search_cache_ttl
+        # Source ratings file (CSV/JSON, hot-reloaded on change); built-in ratings if it does not exist
+        self.reliability_path = reliability_path if reliability_path and os.path.exists(reliability_path) else None
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.fetch_deadline = fetch_deadline
+        self.cache_dir = cache_dir
+        # processes > 0 moves HTML extraction and embedding into a pool of worker processes
+        self.processes = processes
+        self.torch_threads = torch_threads
+        # embedding_backend: "torch" (fp32), "torch-int8" or "onnx-int8" (see embedding_backends.py)
+        self.embedding_backend = embedding_backend
+        # evidence_mode: "live" (news APIs + scraping), "local" (evidence_store only) or "both"
+        self.evidence_store = evidence_store
+        self.evidence_mode = evidence_mode if evidence_store else "live"
+        # With tracing on, stage/provider/host latencies and failures are recorded in self.metrics
+        # and every detect() result carries a 'timings' block
+        self.metrics = Metrics() if tracing else NULL_METRICS
+        # With verdict_ttl set, results are reused for repeated and near-duplicate (paraphrased) claims
+        # With early_exit, sources are fetched most reliable first and the rest are cancelled once they
+        # can no longer change the verdict (confidence is then computed from the evidence seen so far)
+        self.early_exit = early_exit
+        self.verdicts = VerdictCache(threshold=verdict_threshold, ttl=verdict_ttl, capacity=verdict_capacity) if verdict_ttl else None
+
+        # Components are built on first use (thread-safe); startup_times records the cost of each
+        self._components = {}
+        self._component_locks = {name: threading.Lock() for name in self.COMPONENTS}
+        self.startup_times = {}
+
+        if lazy:
+            print("✓ Components will load on first use (call warmup() to preload)\n")
+        else:
+            for name in self._used_components(): self._component(name)
+            print("\n✓ All components initialized!\n")
+
+    # ----------------- COMPONENTS --------------------
+    def _component(self, name):
+        component = self._components.get(name)
+        if component is not None: return component
+        with self._component_locks[name]:
+            if name not in self._components:
+                start = time.perf_counter()
+                self._components[name] = getattr(self, f"_load_{name}")()
+                self.startup_times[name] = time.perf_counter() - start
+        return self._components[name]
+
+    def _load_offload(self):
+        return ProcessOffload(self.processes, torch_threads=self.torch_threads, backend=self.embedding_backend) if self.processes else None
+
+    def _load_classifier(self):
+        return FakeNewsClassifier(model_path="models/fake_news_model.pkl")
+
+    def _load_searcher(self):
+        return MultiSourceSearcher(self.api_keys, endpoints=self.search_endpoints, metrics=self.metrics,
+                                   cache_ttl=self.search_cache_ttl, rate_limits=self.search_rate_limits,
+                                   reliability=ReliabilityRegistry(self.reliability_path))
+
+    def _load_parser(self):
+        return ArticleParser(cache=ArticleCache(os.path.join(self.cache_dir, "articles.sqlite3")) if self.cache_dir else None,
+                             metrics=self.metrics, offload=self.offload)
 
+    def _load_fetcher(self):
+        return ConcurrentFetcher(self.parser, max_workers=self.max_workers, per_host_limit=self.per_host_limit,
+                                 deadline=self.fetch_deadline, metrics=self.metrics)
+
+    def _load_verifier(self):
+        return RAGNLIVerifier(cache_dir=self.cache_dir, metrics=self.metrics, offload=self.offload, backend=self.embedding_backend)
+
+    def _load_scorer(self):
+        return HybridScorer()
+
+    def _load_presenter(self):
+        return EvidencePresenter()
+
+    def _load_evidence(self):
+        return EvidenceStore(self.evidence_store, self.verifier.embed, self.verifier.cache.dim) if self.evidence_store else None
+
+    def _used_components(self):
+        return [name for name in self.COMPONENTS
+                if not (name == "evidence" and self.evidence_mode == "live")
+                and not (name == "offload" and not self.processes)
+                and not (name == "searcher" and self.evidence_mode == "local")]
+
+    def warmup(self):
+        """Load every component and run a dummy style pass and encode to page in model weights"""
+        for name in self._used_components(): self._component(name)
+        start = time.perf_counter()
+        self.classifier.analyze_style("warmup")
+        self.verifier._encode_uncached(["warmup sentence for the embedding model"])
+        self.startup_times["warmup"] = time.perf_counter() - start
         print("\n✓ All components initialized!\n")
+        return self.startup_report()
+
+    def startup_report(self):
+        """Seconds spent loading each component so far (unloaded components are omitted)"""
+        report = dict(self.startup_times)
+        report["total"] = sum(report.values())
+        return report
+
+    def health(self):
+        """Cheap liveness info that never triggers component loading"""
+        return {"loaded": [name for name in self.COMPONENTS if name in self._components],
+                "startup": self.startup_report()}
 
     def detect(self, claim, max_sources=10):
+        if not claim or not claim.strip(): return self._empty_result()
+        cached = self._cached(claim, max_sources)
+        if cached: return cached
+
+        if not self.metrics.enabled:
+            result = self._detect(claim, max_sources)
+        else:
+            trace = Trace()
+            token = current_trace.set(trace)
+            try:
+                with self.metrics.timer("stage", stage="total"):
+                    result = self._detect(claim, max_sources)
+            finally:
+                current_trace.reset(token)
+            result['timings'] = trace.summary()
+        self._remember(claim, result, max_sources)
+        return result
+
+    def _cached(self, claim, max_sources):
+        if self.verdicts is None: return None
+        result = self.verdicts.get(claim, scope=max_sources)
+        self.metrics.incr("verdict_cache", outcome=result['cache']['hit'] if result else "miss")
+        if result and result['cache']['hit'] != "exact":
+            # The matched claim's wording (caps, exclamation marks) is not this one's
+            result['style_features'] = self.classifier.analyze_style(result['claim']).get("features", {})
+            if 'presentation' in result:
+                result['presentation'].update(claim=result['claim'], style_analysis=result['style_features'])
+        return result
+
+    def _remember(self, claim, result, max_sources):
+        # Evidence-less verdicts are often transient (API outage, every fetch timed out), so keep only real ones
+        if self.verdicts is not None and result['evidence']:
+            self.verdicts.put(claim, result, scope=max_sources)
+
+    def _detect(self, claim, max_sources):
         claim = re.sub(r'\s+', ' ', claim).strip()
+        timer = self.metrics.timer
 
         # Step 1: ML Style Analysis
-        style_result = self.classifier.analyze_style(claim)
+        with timer("stage", stage="style"):
+            style_result = self.classifier.analyze_style(claim)
 
         # Step 2: Search evidence
-        sources = self.searcher.search(claim, max_sources)
+        with timer("stage", stage="search"):
+            sources = self._search(claim, max_sources)
         if not sources:
             return self._create_result(claim, "UNVERIFIABLE", 0.0, "No evidence sources found", [], style_result)
 
-        # Step 3: Parse + RAG+NLI verification
+        # Step 3: Parse (concurrently) + RAG+NLI verification as each article arrives
+        tally = None
+        if self.early_exit:
+            sources = sorted(sources, key=lambda src: -src['reliability'])
+            tally = self.scorer.tally(style_result, sources)
         evidence_results=[]
+        contents = self._contents(sources)
+        with timer("stage", stage="evidence"):
+            try:
+                for src, content in contents:
+                    evidence = None
+                    if content:
+                        with timer("stage", stage="verify"):
+                            rag_res=self.verifier.verify(claim, content)
+                        if rag_res['verdict']!='no_evidence':
+                            evidence = self._evidence(src, rag_res)
+                            evidence_results.append(evidence)
+                    if tally is not None:
+                        tally.add(src, evidence)
+                        if tally.decided():
+                            if tally.pending: self.metrics.incr("early_exit")
+                            break
+            finally:
+                contents.close()
+
+        return self._finalize(claim, style_result, evidence_results)
+
+    def detect_batch(self, claims, max_sources=10):
+        """Detect many claims: batched style analysis, shared search/fetch, batched embedding"""
+        claims = [re.sub(r'\s+', ' ', c or '').strip() for c in claims]
+        # Blank claims get no search: an empty query would only spend provider quota
+        results = {"": self._empty_result()} if "" in claims else {}
+        for claim in dict.fromkeys(claims):
+            if claim in results: continue
+            cached = self._cached(claim, max_sources)
+            if cached: results[claim] = cached
+        unique = [claim for claim in dict.fromkeys(claims) if claim not in results]
+        if unique: results.update(self._detect_many(unique, max_sources))
+
+        seen = set(); out = []
+        for claim in claims:
+            out.append(copy.deepcopy(results[claim]) if claim in seen else results[claim])
+            seen.add(claim)
+        return out
+
+    def _detect_many(self, unique, max_sources):
+        timer = self.metrics.timer
+
+        # Step 1: one vectorizer/classifier pass for the whole batch
+        with timer("stage", stage="batch_style"):
+            styles = dict(zip(unique, self.classifier.analyze_style_batch(unique)))
+
+        # Step 2: search each distinct claim once
+        with timer("stage", stage="batch_search"), ThreadPoolExecutor(max_workers=min(8, len(unique)) or 1) as pool:
+            sources = dict(zip(unique, pool.map(lambda c: self._search(c, max_sources), unique)))
+
+        # Step 3: fetch each distinct URL once across the batch (local evidence carries its text)
+        to_fetch = list({src['url']: src for srcs in sources.values() for src in srcs}.values())
+        with timer("stage", stage="batch_fetch"):
+            contents = {src['url']: content for src, content in
+                        self._contents(to_fetch, deadline=self.fetch_deadline * len(unique))}
+
+        # Step 4: embed every claim and evidence sentence in one call (split across worker processes
+        # when offloading), then per-claim verification and scoring hit the embedding cache
+        with timer("stage", stage="batch_embed"):
+            self.verifier.embed(unique + [s for content in contents.values() if content
+                                          for s in self.verifier.split_sentences(content)])
+        results = {}
+        for claim in unique:
+            if not sources[claim]:
+                results[claim] = self._create_result(claim, "UNVERIFIABLE", 0.0, "No evidence sources found", [], styles[claim])
+                continue
+            fetched = [src for src in sources[claim] if contents.get(src['url'])]
+            with timer("stage", stage="batch_verify"):
+                rag_results = self.verifier.verify_batch(claim, [contents[src['url']] for src in fetched])
+            evidence_results = [self._evidence(src, rag_res) for src, rag_res in zip(fetched, rag_results)
+                                if rag_res['verdict'] != 'no_evidence']
+            results[claim] = self._finalize(claim, styles[claim], evidence_results)
+            self._remember(claim, results[claim], max_sources)
+        return results
+
+    def _search(self, claim, max_sources):
+        """Evidence sources from the live searcher, the local evidence store, or both"""
+        sources = []
+        if self.evidence_mode in ("local", "both"):
+            sources.extend(self.evidence.search_sources(claim, max_sources))
+        if self.evidence_mode in ("live", "both"):
+            seen = {src['url'] for src in sources}
+            sources.extend(src for src in self.searcher.search(claim, max_sources) if src['url'] not in seen)
+        return sources
+
+    def _contents(self, sources, deadline=None):
+        """Yield (source, content): local evidence immediately, live sources as the fetcher completes them"""
+        remote = []
         for src in sources:
-            content, parser_used=self.parser.parse(src['url'])
-            if not content: continue
-            rag_res=self.verifier.verify(claim, content)
-            if rag_res['verdict']=='no_evidence': continue
-            evidence_results.append({
-                'source':src['source'],
-                'url':src['url'],
-                'published':src.get('published',''),
-                'reliability':src['reliability'],
-                'verdict':rag_res['verdict'],
-                'confidence':rag_res['confidence'],
-                'similarity':rag_res['similarity'],
-                'snippet':rag_res['snippet']
-            })
+            if 'text' in src: yield src, src['text']
+            else: remote.append(src)
+        if remote:
+            fetched = self.fetcher.fetch(remote, deadline=deadline)
+            try:
+                for src, content, parser_used in fetched:
+                    yield src, content
+            finally:
+                fetched.close()
 
+    def _evidence(self, src, rag_res):
+        return {
+            'source':src['source'],
+            'url':src['url'],
+            'published':src.get('published',''),
+            'reliability':src['reliability'],
+            'verdict':rag_res['verdict'],
+            'confidence':rag_res['confidence'],
+            'similarity':rag_res['similarity'],
+            'snippet':rag_res['snippet']
+        }
+
+    def _finalize(self, claim, style_result, evidence_results):
         if not evidence_results:
             return self._create_result(claim,"UNVERIFIABLE",0.0,"No verifiable evidence found",[],style_result)
 
-        # Step 4: Hybrid scoring
-        final_res=self.scorer.score(claim,style_result,evidence_results)
+        # Hybrid scoring
+        with self.metrics.timer("stage", stage="score"):
+            final_res=self.scorer.score(claim,style_result,evidence_results)
 
-        # Step 5: Presentation
+        # Presentation
         result=self._create_result(claim,final_res['verdict'],final_res['confidence'],final_res['reasoning'],evidence_results,style_result)
-        result['presentation']=self.presenter.present(result,evidence_results)
+        with self.metrics.timer("stage", stage="present"):
+            result['presentation']=self.presenter.present(result,evidence_results)
         return result
 
+    def _empty_result(self):
+        return self._create_result("", "UNVERIFIABLE", 0.0, "Empty claim", [], {})
+
     def _create_result(self, claim, verdict, confidence, reasoning, evidence, style_result):
         return {
             'claim':claim,
@@ -0,0 +1,177 @@
+import os
+import re
+import time
+import numpy as np
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+
+class EmbeddingBackend:
+    """Sentence embedder interface: encode(texts) returns L2-normalized float32 rows of width `dim`"""
+
+    name = None
+
+    def __init__(self, model_name=DEFAULT_MODEL):
+        self.model_name = model_name
+        self.dim = None
+
+    @property
+    def cache_name(self):
+        """Embedding cache namespace; backends whose vectors differ must not share cached rows"""
+        return f"{self.model_name}@{self.name}"
+
+    def encode(self, texts, batch_size=256):
+        raise NotImplementedError
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True).clip(1e-12)
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """Reference backend: full-precision PyTorch SentenceTransformer"""
+
+    name = "torch"
+
+    def __init__(self, model_name=DEFAULT_MODEL):
+        super().__init__(model_name)
+        from sentence_transformers import SentenceTransformer  # deferred: pulls in torch
+        self.model = SentenceTransformer(model_name, device="cpu")
+        # renamed get_embedding_dimension in newer sentence-transformers
+        dimension = getattr(self.model, "get_embedding_dimension", None) or self.model.get_sentence_embedding_dimension
+        self.dim = dimension()
+
+    def encode(self, texts, batch_size=256):
+        return self.model.encode(texts, batch_size=batch_size, normalize_embeddings=True,
+                                 convert_to_numpy=True, show_progress_bar=False)
+
+class QuantizedTorchBackend(SentenceTransformerBackend):
+    """SentenceTransformer with every nn.Linear dynamically quantized to int8 (CPU only)"""
+
+    name = "torch-int8"
+
+    def __init__(self, model_name=DEFAULT_MODEL):
+        super().__init__(model_name)
+        import torch
+        self.model = torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+
+class OnnxBackend(EmbeddingBackend):
+    """ONNX Runtime backend over an exported transformer, int8-quantized by default.
+
+    The model is exported (and quantized) on first use into `model_dir`, default
+    models/onnx/<model_name>. Mean pooling and normalization match the SentenceTransformer.
+    """
+
+    name = "onnx-int8"
+
+    def __init__(self, model_name=DEFAULT_MODEL, model_dir=None, quantized=True, threads=None, max_length=256):
+        super().__init__(model_name)
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+        if not quantized: self.name = "onnx"
+        self.model_dir = model_dir or os.path.join("models", "onnx", re.sub(r'[^\w.-]+', '_', model_name))
+        path = os.path.join(self.model_dir, "model_int8.onnx" if quantized else "model.onnx")
+        if not os.path.exists(path): export_onnx(model_name, self.model_dir, quantize=quantized)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir)
+        self.max_length = max_length
+        options = ort.SessionOptions()
+        if threads: options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.dim = self.session.get_outputs()[0].shape[-1]
+
+    def encode(self, texts, batch_size=256):
+        out = []
+        for start in range(0, len(texts), batch_size):
+            batch = self.tokenizer(list(texts[start:start+batch_size]), padding=True, truncation=True,
+                                   max_length=self.max_length, return_tensors="np")
+            hidden = self.session.run(None, {name: batch[name].astype(np.int64) for name in self.input_names})[0]
+            mask = batch["attention_mask"][..., None].astype(np.float32)
+            out.append(_normalize((hidden * mask).sum(axis=1) / mask.sum(axis=1).clip(1e-9)))
+        return np.concatenate(out) if out else np.zeros((0, self.dim), dtype=np.float32)
+
+def export_onnx(model_name, model_dir, quantize=True):
+    """Export the SentenceTransformer's transformer to ONNX (and an int8 copy) with its tokenizer"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer, tokenizer = model[0].auto_model, model.tokenizer
+    os.makedirs(model_dir, exist_ok=True)
+    tokenizer.save_pretrained(model_dir)
+
+    sample = tokenizer(["a short sentence to trace the export"], return_tensors="pt")
+    names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    fp32_path = os.path.join(model_dir, "model.onnx")
+    axes = {name: {0: "batch", 1: "sequence"} for name in names + ["last_hidden_state"]}
+    with torch.no_grad():
+        torch.onnx.export(transformer, tuple(sample[name] for name in names), fp32_path, input_names=names,
+                          output_names=["last_hidden_state"], dynamic_axes=axes, opset_version=14, dynamo=False)
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(fp32_path, os.path.join(model_dir, "model_int8.onnx"), weight_type=QuantType.QInt8)
+    print(f"✓ Exported ONNX model to {model_dir}")
+
+BACKENDS = {
+    "torch": SentenceTransformerBackend,
+    "torch-int8": QuantizedTorchBackend,
+    "onnx-int8": OnnxBackend,
+    "onnx": lambda model_name=DEFAULT_MODEL, **kwargs: OnnxBackend(model_name, quantized=False, **kwargs),
+}
+
+def load_backend(backend="torch", model_name=DEFAULT_MODEL, **kwargs):
+    """Backend instance from a name in BACKENDS; an EmbeddingBackend instance is returned as is"""
+    if isinstance(backend, EmbeddingBackend): return backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend {backend!r}; choose from {', '.join(BACKENDS)}")
+    return BACKENDS[backend](model_name, **kwargs)
+
+def parity_report(reference, candidate, claims, documents):
+    """Compare a candidate verifier against the reference one on (claim, document) pairs.
+
+    Both arguments are RAGNLIVerifier instances. Reports per-sentence cosine deviation of the
+    candidate embeddings from the reference, verdict agreement, and encode time per backend.
+    """
+    sentences = list(dict.fromkeys(s for doc in documents for s in reference.split_sentences(doc or '')))
+    timings = {}
+    vectors = {}
+    for label, verifier in (("reference", reference), ("candidate", candidate)):
+        start = time.perf_counter()
+        vectors[label] = verifier._encode_uncached(sentences + list(claims))
+        timings[label] = time.perf_counter() - start
+    deviation = 1.0 - np.sum(vectors["reference"] * vectors["candidate"], axis=1)
+
+    ref_results = [reference.verify(claim, doc) for claim, doc in zip(claims, documents)]
+    cand_results = [candidate.verify(claim, doc) for claim, doc in zip(claims, documents)]
+    agree = [r['verdict'] == c['verdict'] for r, c in zip(ref_results, cand_results)]
+    return {
+        "reference": reference.embedder.name,
+        "candidate": candidate.embedder.name,
+        "texts": len(deviation),
+        "cosine_deviation": {"mean": float(deviation.mean()), "p99": float(np.percentile(deviation, 99)),
+                             "max": float(deviation.max())},
+        "verdict_agreement": float(np.mean(agree)) if agree else None,
+        "pairs": len(agree),
+        "encode_seconds": timings,
+        "speedup": timings["reference"] / timings["candidate"] if timings["candidate"] else None,
+    }
+
+
+# PARITY CHECK
+if __name__ == "__main__":
+    import json
+    import argparse
+    import pandas as pd
+    from verifier import RAGNLIVerifier
+
+    args = argparse.ArgumentParser(description="Compare an embedding backend against the fp32 reference")
+    args.add_argument("--backend", default="torch-int8", choices=[name for name in BACKENDS if name != "torch"])
+    args.add_argument("--model", default=DEFAULT_MODEL)
+    args.add_argument("--csv", nargs="+", default=["data/True.csv", "data/Fake.csv"], help="title/text CSVs to sample")
+    args.add_argument("--samples", type=int, default=200)
+    args.add_argument("--seed", type=int, default=42)
+    args = args.parse_args()
+
+    data = pd.concat([pd.read_csv(path).fillna("") for path in args.csv])
+    data = data.sample(min(args.samples, len(data)), random_state=args.seed)
+    reference = RAGNLIVerifier(backend="torch", model_name=args.model)
+    candidate = RAGNLIVerifier(backend=args.backend, model_name=args.model)
+    print(json.dumps(parity_report(reference, candidate, list(data["title"]), list(data["text"])), indent=2))
@@ -0,0 +1,154 @@
+import os
+import re
+import atexit
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
+try:
+    import fcntl
+except ImportError:  # Windows: slot allocation is only serialized within the process
+    fcntl = None
+
+class EmbeddingCache:
+    """Content-addressed sentence embedding cache: in-memory LRU backed by a float16 memmap on disk.
+
+    The disk store is a ring of `disk_items` slots that several processes (e.g. uvicorn workers
+    sharing FAKENEWS_CACHE_DIR) can use at once; the oldest rows are overwritten first.
+    """
+
+    def __init__(self, model_name, dim, cache_dir=None, memory_items=50000, disk_items=1000000, flush_every=1024):
+        self.model_name = model_name
+        self.dim = dim
+        self.memory_items = memory_items
+        self.disk_items = disk_items
+        self.flush_every = flush_every
+        self._memory = OrderedDict()
+        self._lock = threading.RLock()
+        self.stats_counts = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+        self._index = None
+        if cache_dir:
+            self._open_disk(os.path.join(cache_dir, re.sub(r'[^\w.-]+', '_', model_name)))
+            atexit.register(self.flush)
+
+    # ----------------- DISK STORE --------------------
+    # Row i of vectors.f16 belongs to the 16-byte key in row i of keys.bin (all zeros: empty). Slots are
+    # handed out round-robin from a cursor shared by every process using the directory, under a file
+    # lock; readers check the key after copying the row, so a slot rewritten by another process (or
+    # left half-written by a crash) reads as a miss, never as another sentence's vector.
+    def _open_disk(self, path):
+        os.makedirs(path, exist_ok=True)
+        self._lock_file = open(os.path.join(path, "lock"), "a+b")
+        self._index = {}
+        self._dirty = 0
+        with self._file_lock():
+            vectors_path = os.path.join(path, "vectors.f16")
+            fresh = not os.path.exists(vectors_path)
+            self._vectors = self._open_memmap(vectors_path, np.float16, (self.disk_items, self.dim))
+            self._keys = self._open_memmap(os.path.join(path, "keys.bin"), np.uint8, (self.disk_items, 16))
+            if fresh: self._keys[:] = 0  # keys left over from a deleted vectors file point at zero rows
+            self._cursor = self._open_memmap(os.path.join(path, "cursor.i8"), np.int64, (1,))
+        for slot in np.flatnonzero(self._keys.any(axis=1)):
+            self._index[self._keys[slot].tobytes()] = int(slot)
+
+    def _open_memmap(self, path, dtype, shape):
+        # Never recreate an existing file: other processes may have it mapped, and shrinking it under them is a SIGBUS
+        if not os.path.exists(path): return np.memmap(path, dtype=dtype, mode="w+", shape=shape)
+        expected = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if os.path.getsize(path) != expected:
+            raise ValueError(f"{path} holds {os.path.getsize(path)} bytes, expected {expected} for "
+                             f"disk_items={self.disk_items}, dim={self.dim}; use another cache_dir or delete it")
+        return np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield; return
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _disk_get(self, key):
+        slot = self._index.get(key)
+        if slot is None: return None
+        vec = np.asarray(self._vectors[slot], dtype=np.float32)
+        if self._keys[slot].tobytes() != key:
+            del self._index[key]; return None
+        return vec
+
+    def _disk_put(self, key, vec):
+        slot = self._index.get(key)
+        if slot is not None and self._keys[slot].tobytes() == key: return
+        with self._file_lock():
+            slot = int(self._cursor[0]) % self.disk_items
+            self._cursor[0] += 1
+            old = self._keys[slot].tobytes()
+            self._keys[slot] = 0
+            self._vectors[slot] = vec
+            self._keys[slot] = np.frombuffer(key, dtype=np.uint8)
+        if self._index.get(old) == slot: del self._index[old]
+        self._index[key] = slot
+        self._dirty += 1
+        if self._dirty >= self.flush_every: self.flush()
+
+    def flush(self):
+        """Persist the vector, key and cursor memmaps"""
+        with self._lock:
+            if self._index is None or not self._dirty: return
+            self._vectors.flush()
+            self._keys.flush()
+            self._cursor.flush()
+            self._dirty = 0
+
+    # ----------------- LOOKUP --------------------
+    def _key(self, text):
+        text = re.sub(r'\s+', ' ', unicodedata.normalize("NFC", text)).strip()
+        return hashlib.blake2b(f"{self.model_name}\0{text}".encode("utf-8"), digest_size=16).digest()
+
+    def _remember(self, key, vec):
+        self._memory[key] = vec
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_items: self._memory.popitem(last=False)
+
+    def encode(self, texts, encode_fn):
+        """Return embeddings for texts, calling encode_fn only for cache misses"""
+        keys = [self._key(t) for t in texts]
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        missing = OrderedDict()
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vec = self._memory.get(key)
+                if vec is not None:
+                    self._memory.move_to_end(key); out[i] = vec
+                    self.stats_counts['memory_hits'] += 1; continue
+                vec = self._disk_get(key) if self._index is not None else None
+                if vec is not None:
+                    self._remember(key, vec); out[i] = vec
+                    self.stats_counts['disk_hits'] += 1; continue
+                missing.setdefault(key, []).append(i)
+            self.stats_counts['misses'] += len(missing)
+
+        if missing:
+            miss_texts = [texts[rows[0]] for rows in missing.values()]
+            vecs = np.asarray(encode_fn(miss_texts), dtype=np.float32)
+            with self._lock:
+                for (key, rows), vec in zip(missing.items(), vecs):
+                    out[rows] = vec
+                    self._remember(key, vec)
+                    if self._index is not None: self._disk_put(key, vec)
+        return out
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self.stats_counts)
+            lookups = sum(counts.values())
+            counts['hit_rate'] = (counts['memory_hits'] + counts['disk_hits']) / lookups if lookups else 0.0
+            counts['memory_items'] = len(self._memory)
+            counts['disk_items'] = len(self._index) if self._index is not None else 0
+            return counts
@@ -0,0 +1,227 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+import numpy as np
+
+class EvidenceStore:
+    """Offline evidence corpus: sentence chunks with memory-mapped embeddings and an IVF index.
+
+    `encode` maps a list of texts to L2-normalized float vectors (RAGNLIVerifier.embed).
+    Until the corpus has enough chunks to train `n_lists` centroids, search is exact.
+    """
+
+    def __init__(self, path, encode, dim, n_lists=256, n_probe=8, batch_size=1024):
+        self.path = path
+        self.encode = encode
+        self.dim = dim
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.batch_size = batch_size
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+
+        self._db = sqlite3.connect(os.path.join(path, "chunks.sqlite3"), check_same_thread=False)
+        with self._db:
+            self._db.execute("CREATE TABLE IF NOT EXISTS docs (id INTEGER PRIMARY KEY, url TEXT, title TEXT, "
+                             "source TEXT, published TEXT, reliability REAL)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS chunks (id INTEGER PRIMARY KEY, doc_id INTEGER, text TEXT)")
+
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                stored_dim = json.load(f).get("dim", dim)
+            if stored_dim != dim:
+                raise ValueError(f"Evidence store {path} holds {stored_dim}-d vectors; the embedder produces {dim}-d")
+
+        # The chunks table is the source of truth (meta.json is only rewritten at the end of an ingest).
+        # Vectors are written before their rows commit, so rows past the end of the file can only come
+        # from a store that was resized behind our back; drop them rather than serve zero vectors
+        self._vectors_path = os.path.join(path, "vectors.f16")
+        self.capacity = os.path.getsize(self._vectors_path) // (dim * 2) if os.path.exists(self._vectors_path) else 0
+        with self._db:
+            self._db.execute("DELETE FROM chunks WHERE id >= ?", (self.capacity,))
+        self.count = self._db.execute("SELECT COALESCE(MAX(id)+1, 0) FROM chunks").fetchone()[0]
+        self._vectors = None
+        self._ensure_capacity(max(self.count, 1))
+
+        self.centroids = None
+        self._assign = np.zeros(0, dtype=np.int32)
+        if os.path.exists(os.path.join(path, "centroids.npy")):
+            self.centroids = np.load(os.path.join(path, "centroids.npy"))
+            assign = np.load(os.path.join(path, "assign.npy"))[:self.count]
+            # Chunks committed after the last save have no list assignment yet
+            tail = np.asarray(self._vectors[len(assign):self.count], dtype=np.float32)
+            self._assign = np.concatenate([assign, self._nearest_list(tail)]) if len(tail) else assign
+        self._lists_dirty = True
+
+    # ----------------- STORAGE --------------------
+    def _ensure_capacity(self, n):
+        if self._vectors is not None and n <= self.capacity: return
+        if self._vectors is None and n <= self.capacity:
+            new_capacity = self.capacity
+        else:
+            new_capacity = max(n, 2 * self.capacity, 65536)
+        if self._vectors is not None: self._vectors.flush()
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(new_capacity * self.dim * 2)
+        self.capacity = new_capacity
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float16, mode="r+", shape=(self.capacity, self.dim))
+
+    def save(self):
+        with self._lock:
+            self._vectors.flush()
+            with open(os.path.join(self.path, "meta.json"), "w") as f:
+                json.dump({"count": self.count, "capacity": self.capacity, "dim": self.dim}, f)
+            if self.centroids is not None:
+                np.save(os.path.join(self.path, "centroids.npy"), self.centroids)
+                np.save(os.path.join(self.path, "assign.npy"), self._assign[:self.count])
+
+    # ----------------- INGEST --------------------
+    def _chunks(self, text):
+        return [s.strip() for s in re.split(r'[.!?]+', text or '') if len(s.split())>5]
+
+    def add_documents(self, docs):
+        """Chunk, embed and index documents: dicts with text and optional url/title/source/published/reliability"""
+        for doc in docs:
+            chunks = self._chunks(doc.get("text"))
+            if not chunks: continue
+            # Embedding is the slow part and needs no shared state, so searches keep running meanwhile
+            vecs = np.concatenate([np.asarray(self.encode(chunks[start:start+self.batch_size]), dtype=np.float32)
+                                   for start in range(0, len(chunks), self.batch_size)])
+            with self._lock:
+                # Vectors first: a crash before the commit leaves only unreferenced rows that the next ingest overwrites
+                self._ensure_capacity(self.count + len(vecs))
+                self._vectors[self.count:self.count+len(vecs)] = vecs
+                with self._db:
+                    doc_id = self._db.execute(
+                        "INSERT INTO docs (url, title, source, published, reliability) VALUES (?, ?, ?, ?, ?)",
+                        (doc.get("url"), doc.get("title", ""), doc.get("source", "Local corpus"),
+                         doc.get("published", ""), doc.get("reliability", 0.60))).lastrowid
+                    if not doc.get("url"):
+                        self._db.execute("UPDATE docs SET url=? WHERE id=?", (f"local://doc/{doc_id}", doc_id))
+                    self._db.executemany("INSERT INTO chunks (id, doc_id, text) VALUES (?, ?, ?)",
+                                         [(self.count + i, doc_id, c) for i, c in enumerate(chunks)])
+                self._append(vecs)
+
+        with self._lock:
+            if self.centroids is None and self.count >= self.n_lists * 40: self.train()
+            self.save()
+
+    def _append(self, vecs):
+        """Account for vectors already written at self.count (see add_documents)"""
+        if self.centroids is not None:
+            self._assign = np.concatenate([self._assign[:self.count], self._nearest_list(vecs)])
+            self._lists_dirty = True
+        self.count += len(vecs)
+
+    # ----------------- IVF INDEX --------------------
+    def _nearest_list(self, vecs):
+        return np.argmax(vecs @ self.centroids.T, axis=1).astype(np.int32)
+
+    def train(self, iterations=10, sample_size=None, seed=0):
+        """(Re)train IVF centroids with spherical k-means on a sample, then assign every chunk"""
+        with self._lock:
+            rng = np.random.default_rng(seed)
+            n_lists = min(self.n_lists, self.count)
+            sample = np.sort(rng.choice(self.count, min(self.count, sample_size or n_lists * 64), replace=False))
+            data = np.asarray(self._vectors[sample], dtype=np.float32)
+            centroids = data[rng.choice(len(data), n_lists, replace=False)]
+            for _ in range(iterations):
+                labels = np.argmax(data @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, data)
+                empty = np.bincount(labels, minlength=n_lists) == 0
+                sums[empty] = data[rng.choice(len(data), int(empty.sum()))]
+                centroids = sums / np.linalg.norm(sums, axis=1, keepdims=True).clip(1e-12)
+            self.centroids = centroids
+
+            self._assign = np.empty(self.count, dtype=np.int32)
+            for start in range(0, self.count, 65536):
+                block = np.asarray(self._vectors[start:start+65536][:self.count-start], dtype=np.float32)
+                self._assign[start:start+len(block)] = self._nearest_list(block)
+            self._lists_dirty = True
+            self.save()
+
+    def _inverted_lists(self):
+        if self._lists_dirty:
+            self._order = np.argsort(self._assign[:self.count], kind="stable")
+            self._offsets = np.concatenate([[0], np.cumsum(np.bincount(self._assign[:self.count], minlength=len(self.centroids)))])
+            self._lists_dirty = False
+        return self._order, self._offsets
+
+    # ----------------- SEARCH --------------------
+    def search(self, query, k=10):
+        """Top-k chunks for a query string; each hit has score, text and its document's metadata"""
+        if not self.count: return []
+        q = np.asarray(self.encode([query]), dtype=np.float32)[0]
+        with self._lock:
+            if self.centroids is None:
+                rows = np.arange(self.count)
+            else:
+                order, offsets = self._inverted_lists()
+                probe = np.argsort(-(self.centroids @ q))[:self.n_probe]
+                rows = np.sort(np.concatenate([order[offsets[l]:offsets[l+1]] for l in probe]))
+            if not len(rows): return []
+            scores = np.asarray(self._vectors[rows], dtype=np.float32) @ q
+
+        top = np.argsort(-scores)[:k]
+        ids = [int(rows[i]) for i in top]
+        with self._lock:
+            found = {row[0]: row[1:] for row in self._db.execute(
+                "SELECT c.id, c.text, d.url, d.title, d.source, d.published, d.reliability "
+                f"FROM chunks c JOIN docs d ON d.id = c.doc_id WHERE c.id IN ({','.join('?' * len(ids))})", ids)}
+        return [dict(zip(("text", "url", "title", "source", "published", "reliability"), found[i]),
+                     chunk_id=i, score=float(scores[t])) for t, i in zip(top, ids) if i in found]
+
+    def search_sources(self, claim, max_results=10, k=50):
+        """Group chunk hits into source dicts shaped like MultiSourceSearcher results, with text inline"""
+        sources = {}
+        for hit in self.search(claim, k):
+            src = sources.setdefault(hit["url"], {
+                "title": hit["title"], "url": hit["url"], "source": hit["source"],
+                "published": hit["published"], "description": "", "content": "",
+                "reliability": hit["reliability"], "text": []})
+            src["text"].append(hit["text"])
+        results = list(sources.values())[:max_results]
+        for src in results: src["text"] = ". ".join(src["text"]) + "."
+        return results
+
+    def ingest_csv(self, csv_path, source=None, reliability=0.60, chunksize=1000):
+        """Stream a CSV with title/text(/date/subject) columns, e.g. data/True.csv, into the store"""
+        import pandas as pd
+        name = os.path.basename(csv_path)
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            chunk = chunk.fillna("")
+            self.add_documents([{
+                "title": row.get("title", ""),
+                "text": row.get("text", ""),
+                "source": source or name,
+                "published": str(row.get("date", "")),
+                "reliability": reliability,
+                "url": f"local://{name}#{idx}",
+            } for idx, row in zip(chunk.index, chunk.to_dict("records"))])
+            print(f"  indexed {self.count} chunks")
+
+
+# INGEST MODE
+if __name__ == "__main__":
+    import argparse
+    from verifier import RAGNLIVerifier
+
+    args = argparse.ArgumentParser(description="Build the offline evidence store")
+    args.add_argument("csv", nargs="+", help="CSV files with title/text columns (e.g. data/True.csv)")
+    args.add_argument("--store", default="evidence", help="evidence store directory")
+    args.add_argument("--source", help="outlet name to record for every article")
+    args.add_argument("--reliability", type=float, default=0.60)
+    args.add_argument("--retrain", action="store_true", help="retrain IVF centroids after ingesting")
+    args = args.parse_args()
+
+    verifier = RAGNLIVerifier()
+    store = EvidenceStore(args.store, verifier.embed, verifier.cache.dim)
+    for path in args.csv:
+        print(f"Ingesting {path}...")
+        store.ingest_csv(path, source=args.source, reliability=args.reliability)
+    if args.retrain: store.train()
+    print(f"✓ Evidence store ready: {store.count} chunks")
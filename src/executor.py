@@ -0,0 +1,93 @@
+import os
+import math
+import numpy as np
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from embedding_backends import DEFAULT_MODEL
+
+# Per-process state, set up once by _init_worker
+_model = None
+_parser = None
+
+def _init_worker(backend, model_name, torch_threads, batch_size):
+    global _model, _parser
+    if model_name:
+        # Limit intra-op threads before torch starts its pools so N processes x M threads fits the cores
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+            os.environ[var] = str(torch_threads)
+        import torch
+        torch.set_num_threads(torch_threads)
+        from embedding_backends import load_backend
+        _model = load_backend(backend, model_name)
+        _model.batch_size = batch_size
+    from parser import ArticleParser
+    _parser = ArticleParser()
+
+def _encode_into(texts, shm_name, offset, shape):
+    """Encode texts and write the rows straight into the caller's shared output buffer"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        out = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        out[offset:offset+len(texts)] = _model.encode(texts, batch_size=_model.batch_size)
+        del out
+    finally:
+        shm.close()
+    return len(texts)
+
+def _extract(url, body, charset):
+    return _parser._extract(url, body, charset)
+
+def _describe():
+    return _model.dim, _model.name, _model.cache_name
+
+class ProcessOffload:
+    """Process pool for CPU-bound work: MiniLM encoding and HTML extraction.
+
+    Workers are spawned (not forked, which is unsafe with torch and live threads), load the
+    model once, and run with `torch_threads` intra-op threads each (default cores // processes).
+    Embeddings come back through a shared-memory buffer that the workers fill in place; large
+    encode calls are split into one chunk per process. HTML extraction runs in a separate, model-free
+    pool of `extract_processes` with an `extract_timeout`, so a pathological page cannot hold up encoding. The pool exposes the workers' `dim`, `name`
+    and `cache_name`, so the parent can use it in place of an EmbeddingBackend without loading one.
+    """
+
+    def __init__(self, processes=None, model_name=DEFAULT_MODEL, torch_threads=None, batch_size=256, min_chunk=32,
+                 backend="torch", extract_processes=None, extract_timeout=15.0):
+        cores = os.cpu_count() or 1
+        self.processes = processes or cores
+        self.torch_threads = torch_threads or max(1, cores // self.processes)
+        self.min_chunk = min_chunk
+        self.extract_timeout = extract_timeout
+        spawn = multiprocessing.get_context("spawn")
+        self._pool = ProcessPoolExecutor(self.processes, mp_context=spawn, initializer=_init_worker,
+                                         initargs=(backend, model_name, self.torch_threads, batch_size))
+        self._extract_pool = ProcessPoolExecutor(extract_processes or self.processes, mp_context=spawn,
+                                                 initializer=_init_worker, initargs=(backend, None, 1, batch_size))
+        self.model_name = model_name
+        self.dim = self.name = self.cache_name = None
+        if model_name: self.dim, self.name, self.cache_name = self._pool.submit(_describe).result()
+
+    def encode(self, texts):
+        """L2-normalized float32 embeddings, computed across the pool"""
+        texts = list(texts)
+        if not texts: return np.zeros((0, self.dim), dtype=np.float32)
+        shape = (len(texts), self.dim)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(texts) * self.dim * 4))
+        try:
+            chunk = max(self.min_chunk, math.ceil(len(texts) / self.processes))
+            futures = [self._pool.submit(_encode_into, texts[start:start+chunk], shm.name, start, shape)
+                       for start in range(0, len(texts), chunk)]
+            for fut in futures: fut.result()
+            return np.ndarray(shape, dtype=np.float32, buffer=shm.buf).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def extract(self, url, body, charset=None):
+        """ArticleParser._extract in an extraction worker; raises TimeoutError after extract_timeout seconds"""
+        return self._extract_pool.submit(_extract, url, body, charset).result(timeout=self.extract_timeout)
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._extract_pool.shutdown(wait=False, cancel_futures=True)
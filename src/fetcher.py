@@ -0,0 +1,94 @@
+import time
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from urllib.parse import urlparse
+from metrics import NULL_METRICS
+
+class ConcurrentFetcher:
+    """Fetch and parse sources in parallel with a deadline and per-host limits.
+
+    A source whose host already has `per_host_limit` fetches running waits in that host's queue,
+    not in a pool thread, and is submitted when one of them finishes; the shared pool only ever
+    runs fetches that can make progress, whichever claims they belong to.
+    """
+
+    def __init__(self, parser, max_workers=8, per_host_limit=2, deadline=30.0, metrics=NULL_METRICS):
+        self.parser = parser
+        self.metrics = metrics
+        self.per_host_limit = per_host_limit
+        self.deadline = deadline
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+        self._active = {}
+        self._waiting = {}
+        self._lock = threading.Lock()
+
+    def _schedule(self, job):
+        host = job[0]
+        with self._lock:
+            if self._active.get(host, 0) >= self.per_host_limit:
+                self._waiting.setdefault(host, deque()).append(job); return
+            self._active[host] = self._active.get(host, 0) + 1
+        self._submit(job)
+
+    def _submit(self, job):
+        context = job[-1]
+        self._pool.submit(context.run, self._fetch_one, job)
+
+    def _release(self, host):
+        """Hand the host's slot to its next queued fetch, or free it"""
+        with self._lock:
+            queue = self._waiting.get(host)
+            job = queue.popleft() if queue else None
+            if queue is not None and not queue: del self._waiting[host]
+            if job is None:
+                self._active[host] -= 1
+                if not self._active[host]: del self._active[host]
+        if job is not None: self._submit(job)
+
+    def _fetch_one(self, job):
+        host, src, expires, stop, future, _ = job
+        try:
+            # Dropped without a request: the consumer closed (cancelled) it, or it expired in the host queue
+            if not future.set_running_or_notify_cancel(): return
+            if stop.is_set():
+                future.set_result(("", "cancelled")); return
+            if time.monotonic() >= expires:
+                self.metrics.incr("failures", stage="fetch", reason="deadline")
+                future.set_result(("", "timeout")); return
+            try:
+                future.set_result(self.parser.parse(src['url']))
+            except Exception as e:
+                future.set_exception(e)
+        finally:
+            self._release(host)
+
+    def fetch(self, sources, deadline=None):
+        """Yield (source, content, parser_used) as each article finishes parsing.
+
+        Closing the generator early cancels every fetch that has not started its request.
+        """
+        expires = time.monotonic() + (self.deadline if deadline is None else deadline)
+        stop = threading.Event()
+        futures = {}
+        for src in sources:
+            future = Future()
+            futures[future] = src
+            self._schedule((urlparse(src['url']).netloc.lower(), src, expires, stop, future, contextvars.copy_context()))
+        try:
+            for fut in as_completed(futures, timeout=max(0.0, expires - time.monotonic())):
+                try:
+                    content, parser_used = fut.result()
+                except Exception:
+                    content, parser_used = "", "failed"
+                yield futures[fut], content, parser_used
+        except FuturesTimeout:
+            for fut in futures:
+                if not fut.done(): self.metrics.incr("failures", stage="fetch", reason="deadline")
+        finally:
+            stop.set()
+            for fut in futures: fut.cancel()
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -1,8 +1,44 @@
 
+import sys
+import json
+import argparse
+import contextlib
+from itertools import islice
 from detector import HybridFakeNewsDetector
 
+def read_claims(stream):
+    """Yield (id, claim) from JSONL lines: {"id":..,"claim":..}, a JSON string, or plain text"""
+    for n, line in enumerate(stream):
+        line = line.strip()
+        if not line: continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = line
+        if isinstance(record, dict):
+            yield record.get("id", n), str(record.get("claim") or record.get("text") or "")
+        else:
+            yield n, str(record)
+
+def run_batch(detector, infile, outfile, batch_size=32, max_sources=10):
+    """Stream claims through detect_batch, writing one JSON verdict per line as each chunk finishes"""
+    claims = read_claims(infile)
+    while True:
+        chunk = list(islice(claims, batch_size))
+        if not chunk: break
+        results = detector.detect_batch([claim for _, claim in chunk], max_sources=max_sources)
+        for (claim_id, _), result in zip(chunk, results):
+            result.pop('presentation', None)
+            outfile.write(json.dumps({'id': claim_id, **result}, default=str) + "\n")
+        outfile.flush()
+
 def main():
-    print("\n=== FAKE NEWS DETECTOR ===\n")
+    args = argparse.ArgumentParser(description="Hybrid fake news detector")
+    args.add_argument("--batch", metavar="PATH", help="JSONL file of claims to verify ('-' for stdin)")
+    args.add_argument("--output", metavar="PATH", help="write JSONL verdicts here instead of stdout")
+    args.add_argument("--batch-size", type=int, default=32, help="claims processed together (bounds memory)")
+    args.add_argument("--max-sources", type=int, default=10)
+    args = args.parse_args()
 
     # -----------------------------------------
     # ADD YOUR API KEYS HERE
@@ -13,8 +49,21 @@ def main():
         # "bing": "YOUR_BING_KEY_HERE"   # Optional
     }
 
+    if args.batch:
+        infile = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+        outfile = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        # Keep progress messages off stdout so it stays valid JSONL
+        with contextlib.redirect_stdout(sys.stderr):
+            detector = HybridFakeNewsDetector(api_keys=api_keys)
+            detector.warmup()
+            run_batch(detector, infile, outfile, args.batch_size, args.max_sources)
+        return
+
+    print("\n=== FAKE NEWS DETECTOR ===\n")
+
     # Initialize detector with API keys
     detector = HybridFakeNewsDetector(api_keys=api_keys)
+    detector.warmup()
 
     # Command-line loop
     while True:
@@ -29,4 +78,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,149 @@
+import json
+import time
+import bisect
+import threading
+import contextvars
+from collections import defaultdict
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Per-request trace; thread pools run tasks under copy_context() so this follows the claim
+current_trace = contextvars.ContextVar("current_trace", default=None)
+
+def submit(pool, fn, *args):
+    """pool.submit that carries the caller's trace into the worker thread"""
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Trace:
+    """Timings and failures for a single detect() call, summarized into result['timings']"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages = defaultdict(float)
+        self.providers = {}
+        self.hosts = defaultdict(float)
+        self.failures = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, labels):
+        with self._lock:
+            if name == "stage": self.stages[labels["stage"]] += seconds
+            elif name == "search_provider": self.providers[labels["provider"]] = seconds
+            elif name == "parse": self.hosts[labels["host"]] += seconds
+
+    def fail(self, labels):
+        with self._lock:
+            self.failures[f"{labels['stage']}:{labels['reason']}"] += 1
+
+    def summary(self):
+        with self._lock:
+            return {
+                "total": time.perf_counter() - self.start,
+                "stages": dict(self.stages),
+                "search_providers": dict(self.providers),
+                "parse_hosts": dict(self.hosts),
+                "failures": dict(self.failures),
+            }
+
+class _Timer:
+    __slots__ = ("metrics", "name", "labels", "start")
+
+    def __init__(self, metrics, name, labels):
+        self.metrics, self.name, self.labels = metrics, name, labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+class Metrics:
+    """Latency histograms and failure counters with Prometheus text and JSON export"""
+
+    enabled = True
+
+    def __init__(self, prefix="fakenews"):
+        self.prefix = prefix
+        self._histograms = {}
+        self._counters = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def timer(self, name, **labels):
+        return _Timer(self, name, labels)
+
+    def observe(self, name, seconds, trace_labels=None, **labels):
+        """Record into the `labels` histogram; `trace_labels` (e.g. a host) reach only the current Trace,
+        keeping unbounded values out of the process-wide series"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None: hist = self._histograms[key] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+            hist[0][bisect.bisect_left(BUCKETS, seconds)] += 1
+            hist[1] += seconds
+            hist[2] += 1
+        trace = current_trace.get()
+        if trace is not None: trace.record(name, seconds, {**labels, **trace_labels} if trace_labels else labels)
+
+    def incr(self, name, **labels):
+        with self._lock:
+            self._counters[(name, tuple(sorted(labels.items())))] += 1
+        trace = current_trace.get()
+        if trace is not None and name == "failures": trace.fail(labels)
+
+    def to_json(self):
+        with self._lock:
+            return json.dumps({
+                "histograms": [{"name": name, "labels": dict(labels), "buckets": dict(zip(map(str, BUCKETS + ("+Inf",)), counts)),
+                                "sum": total, "count": count}
+                               for (name, labels), (counts, total, count) in sorted(self._histograms.items())],
+                "counters": [{"name": name, "labels": dict(labels), "value": value}
+                             for (name, labels), value in sorted(self._counters.items())],
+            })
+
+    def to_prometheus(self):
+        def fmt(labels, **extra):
+            items = list(labels) + list(extra.items())
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}" if items else ""
+
+        lines = []
+        with self._lock:
+            typed = set()
+            for (name, labels), (counts, total, count) in sorted(self._histograms.items()):
+                metric = f"{self.prefix}_{name}_seconds"
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} histogram"); typed.add(metric)
+                cumulative = 0
+                for le, n in zip(BUCKETS + ("+Inf",), counts):
+                    cumulative += n
+                    lines.append(f"{metric}_bucket{fmt(labels, le=le)} {cumulative}")
+                lines.append(f"{metric}_sum{fmt(labels)} {total}")
+                lines.append(f"{metric}_count{fmt(labels)} {count}")
+            for (name, labels), value in sorted(self._counters.items()):
+                metric = f"{self.prefix}_{name}_total"
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} counter"); typed.add(metric)
+                lines.append(f"{metric}{fmt(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+class _NullTimer:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): pass
+
+class NullMetrics:
+    """Drop-in no-op used when tracing is off"""
+
+    enabled = False
+    _timer = _NullTimer()
+
+    def timer(self, name, **labels): return self._timer
+    def observe(self, name, seconds, trace_labels=None, **labels): pass
+    def incr(self, name, **labels): pass
+    def to_json(self): return json.dumps({"histograms": [], "counters": []})
+    def to_prometheus(self): return ""
+
+NULL_METRICS = NullMetrics()
@@ -1,24 +1,185 @@
+import re
+import time
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+from metrics import NULL_METRICS
+
+HEADERS = {"User-Agent":"Mozilla/5.0"}
+HTML_TYPES = ("text/html", "application/xhtml+xml", "text/plain", "")
+SKIP_TAGS = {"script", "style", "nav", "footer", "header"}
+MAX_CHARS = 10000
+# newspaper3k builds a full DOM (superlinear in page size), so it only sees pages where the streaming
+# paragraph extractor finds less than MIN_CHARS of text, and then only their first NEWSPAPER_MAX_BYTES
+MIN_CHARS = 200
+NEWSPAPER_MAX_BYTES = 256 * 1024
 
 class ArticleParser:
-    """Parse articles using newspaper3k or BeautifulSoup fallback"""
-    
+    """Parse articles using newspaper3k or a streaming lxml/BeautifulSoup fallback.
+
+    Each page is downloaded once, streamed up to `max_bytes`, and the same bytes feed every
+    extractor: the early-stopping lxml paragraph extractor first, newspaper3k (on a prefix) only
+    when it finds too little text. Responses that are not HTML are rejected before their body is read.
+    """
+
+    def __init__(self, cache=None, metrics=NULL_METRICS, max_bytes=2*1024*1024, pool_size=16, offload=None):
+        self.cache = cache
+        self.metrics = metrics
+        self.offload = offload  # executor.ProcessOffload: run extraction in worker processes
+        self.max_bytes = max_bytes
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
     def parse(self, url):
+        if not self.metrics.enabled: return self._parse(url)
+        start = time.perf_counter()
+        text, parser_used = self._parse(url)
+        # Per-host latency goes to the request's Trace only: one Prometheus series per host would grow without bound
+        self.metrics.observe("parse", time.perf_counter() - start, trace_labels={"host": urlparse(url).netloc.lower()},
+                             parser=parser_used)
+        if not text: self.metrics.incr("failures", stage="parse", reason="no_text")
+        return text, parser_used
+
+    def _parse(self, url):
+        if self.cache is None:
+            text, parser_used, _ = self._fetch(url)
+            return text, parser_used
+
+        entry = self.cache.get(url)
+        if entry:
+            if entry['fresh']:
+                return (entry['text'], entry['parser']) if entry['status'] == 'ok' else ("", "failed")
+            if entry['status'] == 'ok' and (entry['etag'] or entry['last_modified']):
+                revalidated = self._revalidate(url, entry)
+                if revalidated: return revalidated
+
+        text, parser_used, validators = self._fetch(url)
+        self.cache.put(url, text, parser_used, *validators)
+        return text, parser_used
+
+    def _fetch(self, url):
+        try:
+            response, body = self._download(url)
+        except Exception as e:
+            self.metrics.incr("failures", stage="parse", reason=f"download:{type(e).__name__}")
+            return "", "failed", (None, None)
+        if response.status_code != 200 or not body:
+            self.metrics.incr("failures", stage="parse", reason=f"http:{response.status_code}")
+            return "", "failed", (None, None)
+        text, parser_used = self._extract(url, body, self._charset(response))
+        return text, parser_used, self._validators(response)
+
+    def _download(self, url, headers=None):
+        """GET url, streaming at most max_bytes of the body; raises ValueError for non-HTML responses"""
+        with self.session.get(url, headers=headers, timeout=10, stream=True) as response:
+            if response.status_code != 200: return response, b""
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if content_type not in HTML_TYPES: raise ValueError(f"unsupported content type {content_type}")
+            body = bytearray()
+            for chunk in response.iter_content(64 * 1024):
+                if not body and b"\x00" in chunk[:1024]: raise ValueError("binary content")
+                body += chunk
+                if len(body) >= self.max_bytes:
+                    self.metrics.incr("truncated", stage="parse")
+                    del body[self.max_bytes:]
+                    break
+            return response, bytes(body)
+
+    def _extract(self, url, body, charset=None):
+        """Text from downloaded HTML: lxml paragraphs, newspaper3k if they are too short, BeautifulSoup if lxml fails"""
+        if self.offload is not None:
+            try:
+                return self.offload.extract(url, body, charset)
+            except Exception as e:
+                self.metrics.incr("failures", stage="parse", reason=f"offload:{type(e).__name__}")
+                return "", "failed"
+        text = None
+        try:
+            text = self._extract_paragraphs(body, charset)
+            if len(text) >= MIN_CHARS: return text, "lxml"
+        except Exception as e:
+            self.metrics.incr("failures", stage="parse", reason=f"lxml:{type(e).__name__}")
+
         try:
             from newspaper import Article
             article = Article(url)
-            article.download()
+            article.download(input_html=body[:NEWSPAPER_MAX_BYTES])
             article.parse()
-            if article.text: return article.text[:10000], "newspaper3k"
-        except: pass
-        
-        try:
-            response = requests.get(url, headers={"User-Agent":"Mozilla/5.0"}, timeout=10)
-            soup = BeautifulSoup(response.content,'html.parser')
-            for tag in soup(["script","style","nav","footer","header"]): tag.decompose()
-            paragraphs = soup.find_all('p')
-            text=' '.join([p.get_text() for p in paragraphs])
-            return text[:10000], "beautifulsoup"
-        except: pass
+            if len(article.text) > len(text or ""): return article.text[:MAX_CHARS], "newspaper3k"
+        except Exception as e:
+            self.metrics.incr("failures", stage="parse", reason=f"newspaper3k:{type(e).__name__}")
+        if text: return text, "lxml"
+
+        if text is None:
+            try:
+                text = self._extract_soup(body)
+                if text: return text, "beautifulsoup"
+            except Exception as e:
+                self.metrics.incr("failures", stage="parse", reason=f"beautifulsoup:{type(e).__name__}")
         return "", "failed"
+
+    def _revalidate(self, url, entry):
+        """Conditional GET for a stale entry; returns None only if no usable response came back"""
+        headers = {}
+        if entry['etag']: headers["If-None-Match"] = entry['etag']
+        if entry['last_modified']: headers["If-Modified-Since"] = entry['last_modified']
+        try:
+            response, body = self._download(url, headers)
+        except:
+            return None
+        if response.status_code == 304:
+            self.cache.touch(url)
+            return entry['text'], entry['parser']
+        if response.status_code != 200 or not body: return None
+        # A changed page is extracted from the bytes already downloaded, even if it yields no text
+        text, parser_used = self._extract(url, body, self._charset(response))
+        self.cache.put(url, text, parser_used, *self._validators(response))
+        return text, parser_used
+
+    def _validators(self, response):
+        return response.headers.get("ETag"), response.headers.get("Last-Modified")
+
+    def _charset(self, response):
+        match = re.search(r'charset=["\']?([\w.:-]+)', response.headers.get("Content-Type", ""), re.I)
+        return match.group(1) if match else None
+
+    def _extract_paragraphs(self, content, charset=None):
+        """Incremental lxml parse that collects <p> text outside script/style/nav/footer/header
+        and stops feeding input once MAX_CHARS of text has been collected"""
+        from lxml import etree
+        parser = etree.HTMLPullParser(events=("start", "end"), encoding=charset)
+
+        def events():
+            for start in range(0, len(content), 16 * 1024):
+                parser.feed(content[start:start + 16 * 1024])
+                yield from parser.read_events()
+            try:
+                parser.close()
+            except etree.XMLSyntaxError:
+                pass
+            yield from parser.read_events()
+
+        paragraphs, length, skip_depth = [], 0, 0
+        for event, element in events():
+            tag = element.tag if isinstance(element.tag, str) else ""
+            if tag in SKIP_TAGS:
+                skip_depth += 1 if event == "start" else -1
+                if event == "end": element.clear(keep_tail=True)
+            elif event == "end" and tag == "p":
+                if not skip_depth:
+                    text = "".join(element.itertext())
+                    paragraphs.append(text); length += len(text) + 1
+                    if length > MAX_CHARS: break
+                element.clear(keep_tail=True)
+        return ' '.join(paragraphs)[:MAX_CHARS]
+
+    def _extract_soup(self, content):
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(content,'html.parser')
+        for tag in soup(["script","style","nav","footer","header"]): tag.decompose()
+        paragraphs = soup.find_all('p')
+        text=' '.join([p.get_text() for p in paragraphs])
+        return text[:MAX_CHARS]
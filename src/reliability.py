@@ -0,0 +1,142 @@
+import os
+import re
+import csv
+import json
+import time
+import threading
+import unicodedata
+from urllib.parse import urlparse
+
+DEFAULT_RELIABILITY = 0.60
+
+# Built-in ratings, used when no registry file is given
+DEFAULT_SOURCES = [
+    {"name": "reuters", "domain": "reuters.com", "reliability": 0.95},
+    {"name": "associated press", "domain": "apnews.com", "reliability": 0.95},
+    {"name": "ap news", "reliability": 0.95},
+    {"name": "bbc", "domain": "bbc.co.uk", "reliability": 0.90},
+    {"domain": "bbc.com", "reliability": 0.90},
+    {"name": "npr", "domain": "npr.org", "reliability": 0.90},
+    {"name": "pbs", "domain": "pbs.org", "reliability": 0.90},
+    {"name": "cnn", "domain": "cnn.com", "reliability": 0.75},
+    {"name": "fox news", "domain": "foxnews.com", "reliability": 0.75},
+    {"name": "msnbc", "domain": "msnbc.com", "reliability": 0.75},
+]
+
+_END = ""  # trie key holding the score of the name that ends at this node
+
+def name_tokens(name):
+    """Casefolded word tokens of an outlet name, without a leading "the" ("The Associated Press" -> associated, press)"""
+    tokens = re.findall(r"\w+", unicodedata.normalize("NFKC", name or "").casefold())
+    return tokens[1:] if tokens[:1] == ["the"] else tokens
+
+def normalize_domain(domain):
+    domain = (domain or "").strip().lower()
+    if "://" in domain: domain = urlparse(domain).hostname or ""
+    domain = domain.split("/")[0].split(":")[0].rstrip(".")
+    return domain[4:] if domain.startswith("www.") else domain
+
+class _Index:
+    __slots__ = ("domains", "names", "size")
+
+    def __init__(self, entries):
+        self.domains = {}
+        self.names = {}
+        self.size = 0
+        for entry in entries:
+            score = float(entry["reliability"])
+            for domain in filter(None, (entry.get("domain") or "").split("|")):
+                self.domains[normalize_domain(domain)] = score
+            for name in filter(None, (entry.get("name") or "").split("|")):
+                tokens = name_tokens(name)
+                if not tokens: continue
+                node = self.names
+                for token in tokens: node = node.setdefault(token, {})
+                node[_END] = score
+            self.size += 1
+
+class ReliabilityRegistry:
+    """Source reliability ratings indexed by domain and by outlet name.
+
+    Entries come from a CSV (name, domain, reliability columns) or JSON file (a list of such
+    objects, or {name: reliability}); several names or domains can be joined with "|".
+    Lookups try the article URL's host and its parent domains (uk.reuters.com -> reuters.com),
+    then the source name as a domain ("apnews.com"), then the longest rated name prefix on word
+    boundaries ("Reuters UK" -> reuters). Cost depends only on the length of the host and name.
+    The file is re-read when its mtime changes (checked at most every `check_interval` seconds);
+    the new index is built off to the side and swapped in, so lookups never block.
+    """
+
+    def __init__(self, path=None, default=DEFAULT_RELIABILITY, check_interval=5.0):
+        self.path = path
+        self.default = default
+        self.check_interval = check_interval
+        self._mtime = None
+        self._checked = 0.0
+        self._reload_lock = threading.Lock()
+        self._index = _Index(DEFAULT_SOURCES)
+        if path: self.reload()
+
+    def __len__(self):
+        return self._index.size
+
+    # ----------------- LOADING --------------------
+    def _read(self, path):
+        if path.endswith(".json"):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                return [{"name": name, "reliability": score} for name, score in data.items()]
+            return data
+        with open(path, newline="", encoding="utf-8") as f:
+            return [row for row in csv.DictReader(f) if (row.get("reliability") or "").strip()]
+
+    def reload(self):
+        """Re-read the registry file; keeps the current index if the file is missing or invalid"""
+        with self._reload_lock:
+            self._checked = time.monotonic()
+            try:
+                mtime = os.path.getmtime(self.path)
+                if mtime == self._mtime: return False
+                index = _Index(self._read(self.path))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠ Could not load source reliability from {self.path}: {e}")
+                return False
+            self._index, self._mtime = index, mtime
+            return True
+
+    def _maybe_reload(self):
+        if self.path and time.monotonic() - self._checked > self.check_interval and not self._reload_lock.locked():
+            self.reload()
+
+    # ----------------- LOOKUP --------------------
+    def _domain_score(self, index, host):
+        labels = normalize_domain(host).split(".")
+        # Walk up to the registrable part; stop before the bare TLD
+        for i in range(len(labels) - 1):
+            score = index.domains.get(".".join(labels[i:]))
+            if score is not None: return score
+        return None
+
+    def _name_score(self, index, name):
+        node, best = index.names, None
+        for token in name_tokens(name):
+            node = node.get(token)
+            if node is None: break
+            best = node.get(_END, best)
+        return best
+
+    def lookup(self, source=None, url=None):
+        """Reliability for an article: URL domain, then source name as a domain, then name prefix, then default"""
+        self._maybe_reload()
+        index = self._index
+        if url:
+            score = self._domain_score(index, urlparse(url).hostname or "")
+            if score is not None: return score
+        if source:
+            if "." in source and " " not in source.strip():
+                score = self._domain_score(index, source)
+                if score is not None: return score
+            score = self._name_score(index, source)
+            if score is not None: return score
+        return self.default
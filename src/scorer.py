@@ -1,8 +1,26 @@
+MAX_EVIDENCE_CONFIDENCE=0.95  # RAGNLIVerifier caps confidence here; similarity is at most 1
+
 class HybridScorer:
     """Combine style, evidence, NLI"""
 
+    def _decide(self, style_score, supports_score, refutes_score):
+        style_weight=0.25; evidence_weight=0.5; nli_weight=0.25
+        total_evidence=supports_score+refutes_score
+        consistency_score=max(supports_score,refutes_score)/(total_evidence+0.01)
+        if supports_score>refutes_score*1.2:
+            style_penalty=style_score*0.3
+            raw_conf=(1-style_score)*style_weight+(supports_score/(total_evidence+0.01))*evidence_weight+consistency_score*nli_weight-style_penalty
+            confidence=max(0.0,min(raw_conf,0.95))
+            return ('TRUE' if confidence>0.70 else 'LIKELY TRUE'), confidence, consistency_score
+        if refutes_score>supports_score*1.2:
+            style_bonus=style_score*0.2
+            raw_conf=style_score*style_weight+(refutes_score/(total_evidence+0.01))*evidence_weight+consistency_score*nli_weight+style_bonus
+            confidence=max(0.0,min(raw_conf,0.95))
+            return ('FALSE' if confidence>0.70 else 'LIKELY FALSE'), confidence, consistency_score
+        return 'UNVERIFIABLE', 0.5, consistency_score
+
     def score(self, claim, style_result, evidence_results):
-        style_score=style_result['style_score']; style_weight=0.25
+        style_score=style_result['style_score']
         if not evidence_results:
             return {'verdict':'UNVERIFIABLE','confidence':0.0,'reasoning':'No evidence found','scores':{'style':style_score,'evidence':0.0,'nli':0.0}}
         supports_score=refutes_score=0.0; evidence_count={'supports':0,'refutes':0}
@@ -10,22 +28,49 @@ class HybridScorer:
             weight=ev['reliability']*ev['confidence']*ev['similarity']
             if ev['verdict']=='supports': supports_score+=weight; evidence_count['supports']+=1
             elif ev['verdict']=='refutes': refutes_score+=weight; evidence_count['refutes']+=1
-        total_evidence=supports_score+refutes_score
-        evidence_weight=0.5; consistency_score=max(supports_score,refutes_score)/(total_evidence+0.01); nli_weight=0.25
 
-        if supports_score>refutes_score*1.2:
-            style_penalty=style_score*0.3
-            raw_conf=(1-style_score)*style_weight+(supports_score/(total_evidence+0.01))*evidence_weight+consistency_score*nli_weight-style_penalty
-            confidence=max(0.0,min(raw_conf,0.95))
-            verdict='TRUE' if confidence>0.70 else 'LIKELY TRUE'
+        verdict,confidence,consistency_score=self._decide(style_score,supports_score,refutes_score)
+        if verdict in ('TRUE','LIKELY TRUE'):
             reasoning=f"Supported by {evidence_count['supports']} sources"
             if style_score>0.6: reasoning+=" (but suspicious language detected)"
-        elif refutes_score>supports_score*1.2:
-            style_bonus=style_score*0.2
-            raw_conf=style_score*style_weight+(refutes_score/(total_evidence+0.01))*evidence_weight+consistency_score*nli_weight+style_bonus
-            confidence=max(0.0,min(raw_conf,0.95))
-            verdict='FALSE' if confidence>0.70 else 'LIKELY FALSE'
+        elif verdict in ('FALSE','LIKELY FALSE'):
             reasoning=f"Refuted by {evidence_count['refutes']} sources"
-        else: verdict='UNVERIFIABLE'; confidence=0.5; reasoning=f"Conflicting evidence ({evidence_count['supports']} support, {evidence_count['refutes']} refute)"
+        else: reasoning=f"Conflicting evidence ({evidence_count['supports']} support, {evidence_count['refutes']} refute)"
 
         return {'verdict':verdict,'confidence':confidence,'reasoning':reasoning,'scores':{'style':style_score,'evidence_support':supports_score,'evidence_refute':refutes_score,'consistency':consistency_score},'evidence_count':evidence_count}
+
+    def tally(self, style_result, sources):
+        return EvidenceTally(self, style_result['style_score'], sources)
+
+class EvidenceTally:
+    """Running support/refute totals that tell when the pending sources can no longer change the verdict.
+
+    Each pending source can add at most reliability*MAX_EVIDENCE_CONFIDENCE to either side. The
+    reachable totals form a triangle with corners (S, R), (S+P, R) and (S, R+P), where P is the
+    pending maximum. Every verdict region is an intersection of half-planes in (S, R), so the
+    verdict is settled when all three corners agree.
+    """
+
+    def __init__(self, scorer, style_score, sources):
+        self.scorer = scorer
+        self.style_score = style_score
+        self.pending = {src['url']: src['reliability']*MAX_EVIDENCE_CONFIDENCE for src in sources}
+        self.supports = self.refutes = 0.0
+        self.count = 0
+
+    def add(self, src, evidence=None):
+        """Record a finished source; evidence is None when it was unreachable or had nothing relevant"""
+        self.pending.pop(src['url'], None)
+        if evidence is None: return
+        weight = evidence['reliability']*evidence['confidence']*evidence['similarity']
+        if evidence['verdict'] == 'supports': self.supports += weight
+        elif evidence['verdict'] == 'refutes': self.refutes += weight
+        self.count += 1
+
+    def decided(self):
+        if not self.pending: return True
+        if not self.count: return False
+        pending = sum(self.pending.values())
+        verdict = self.scorer._decide(self.style_score, self.supports, self.refutes)[0]
+        return (self.scorer._decide(self.style_score, self.supports + pending, self.refutes)[0] == verdict and
+                self.scorer._decide(self.style_score, self.supports, self.refutes + pending)[0] == verdict)
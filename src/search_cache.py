@@ -0,0 +1,56 @@
+import re
+import time
+import threading
+import unicodedata
+from collections import OrderedDict
+
+def normalize_query(query):
+    """Collapse case, Unicode forms and whitespace so trivially different claims share a cache entry"""
+    return re.sub(r'\s+', ' ', unicodedata.normalize("NFKC", query).casefold()).strip()
+
+class SearchCache:
+    """TTL cache of provider responses that keeps expired entries around to serve as stale fallbacks"""
+
+    def __init__(self, ttl=900, stale_ttl=86400, max_entries=10000):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (value, fresh); value is None when nothing usable is cached"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None: return None, False
+            stored_at, value = entry
+            age = time.monotonic() - stored_at
+            if age > self.stale_ttl:
+                del self._entries[key]; return None, False
+            self._entries.move_to_end(key)
+            return value, age <= self.ttl
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries: self._entries.popitem(last=False)
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second up to `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens=1):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < tokens: return False
+            self._tokens -= tokens
+            return True
@@ -1,36 +1,63 @@
+import time
 import requests
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Optional, Tuple
+from search_cache import SearchCache, TokenBucket, normalize_query
+from metrics import NULL_METRICS, submit
+from reliability import ReliabilityRegistry
+
+DEFAULT_ENDPOINTS = {
+    "gnews": "https://gnews.io/api/v4/search",
+    "newsapi": "https://newsapi.org/v2/everything",
+    "bing": "https://api.bing.microsoft.com/v7.0/news/search",
+}
 
 class MultiSourceSearcher:
     """Search multiple APIs with fallback"""
 
-    def __init__(self, api_keys: Dict[str, str]):
+    def __init__(self, api_keys: Dict[str, str], endpoints: Optional[Dict[str, str]] = None,
+                 concurrent: bool = True, deadline: float = 10.0, pool_size: int = 10,
+                 cache_ttl: float = 900, rate_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+                 metrics=NULL_METRICS, reliability: Optional[ReliabilityRegistry] = None):
         self.api_keys = api_keys or {}
-
-        # Reliability scores
-        self.source_reliability = {
-            "reuters": 0.95, "associated press": 0.95, "ap news": 0.95,
-            "bbc": 0.90, "npr": 0.90, "pbs": 0.90,
-            "cnn": 0.75, "fox news": 0.75, "msnbc": 0.75,
-            "default": 0.60
-        }
+        self.metrics = metrics
+        self.endpoints = {**DEFAULT_ENDPOINTS, **(endpoints or {})}
+        self.concurrent = concurrent
+        self.deadline = deadline
+
+        # One pooled session so repeated searches reuse TCP/TLS connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.endpoints), pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="search")
+
+        # Provider responses keyed by (provider, normalized query, limit); rate_limits maps
+        # provider -> (requests per second, burst) and is enforced per API key
+        self.cache = SearchCache(ttl=cache_ttl)
+        self.rate_limits = rate_limits or {}
+        self._buckets = {}
+
+        # Reliability scores, by article domain then outlet name (built-in ratings unless a registry file is given)
+        self.reliability = reliability or ReliabilityRegistry()
 
     def search(self, claim: str, max_results: int = 10) -> List[Dict]:
         """Search news from available APIs"""
 
-        results = []
-
-        # GNews
-        if "gnews" in self.api_keys:
-            results.extend(self._search_gnews(claim, max_results))
+        providers = [(name, fn) for name, fn in (
+            ("gnews", self._search_gnews),
+            ("newsapi", self._search_newsapi),
+            ("bing", self._search_bing),
+        ) if name in self.api_keys]
 
-        # NewsAPI
-        if "newsapi" in self.api_keys:
-            results.extend(self._search_newsapi(claim, max_results))
+        if self.concurrent and len(providers) > 1:
+            by_provider = self._fan_out(providers, claim, max_results)
+        else:
+            by_provider = {name: self._query(name, fn, claim, max_results) for name, fn in providers}
 
-        # Bing
-        if "bing" in self.api_keys:
-            results.extend(self._search_bing(claim, max_results))
+        # Keep provider priority order (GNews, NewsAPI, Bing) regardless of completion order
+        results = [r for name, _ in providers for r in by_provider.get(name, [])]
 
         # Deduplicate & reliability score
         results = self._deduplicate(results)
@@ -38,10 +65,56 @@ class MultiSourceSearcher:
 
         return results[:max_results]
 
+    def _fan_out(self, providers, claim: str, max_results: int) -> Dict[str, List[Dict]]:
+        """Query providers in parallel; stop at max_results unique URLs or the deadline"""
+        futures = {submit(self._pool, self._query, name, fn, claim, max_results): name for name, fn in providers}
+        by_provider, seen = {}, set()
+        try:
+            for fut in as_completed(futures, timeout=self.deadline):
+                by_provider[futures[fut]] = fut.result()
+                seen.update(r["url"] for r in by_provider[futures[fut]])
+                if len(seen) >= max_results: break
+        except FuturesTimeout:
+            for name in set(futures.values()) - set(by_provider):
+                self.metrics.incr("failures", stage="search", reason=f"{name}:deadline")
+        finally:
+            for fut in futures: fut.cancel()
+        return by_provider
+
+    def _query(self, provider: str, fn, claim: str, limit: int) -> List[Dict]:
+        """Call one provider through the response cache and its rate limiter"""
+        query = normalize_query(claim)
+        key = (provider, query, limit)
+        cached, fresh = self.cache.get(key)
+        if fresh:
+            self.metrics.incr("search_cache", provider=provider, result="hit")
+            return [dict(r) for r in cached]
+
+        # Out of quota: serve whatever stale answer we have instead of calling the API
+        bucket = self._bucket(provider)
+        if bucket is not None and not bucket.try_acquire():
+            self.metrics.incr("search_cache", provider=provider, result="rate_limited")
+            return [dict(r) for r in cached or []]
+
+        self.metrics.incr("search_cache", provider=provider, result="miss")
+        start = time.perf_counter()
+        results = fn(query, limit)
+        self.metrics.observe("search_provider", time.perf_counter() - start, provider=provider)
+        if results: self.cache.put(key, [dict(r) for r in results])
+        elif cached: return [dict(r) for r in cached]
+        return results
+
+    def _bucket(self, provider: str) -> Optional[TokenBucket]:
+        if provider not in self.rate_limits: return None
+        key = (provider, self.api_keys[provider])
+        if key not in self._buckets:
+            self._buckets.setdefault(key, TokenBucket(*self.rate_limits[provider]))
+        return self._buckets[key]
+
     # ----------------- GNEWS --------------------
     def _search_gnews(self, query: str, limit: int) -> List[Dict]:
         try:
-            url = "https://gnews.io/api/v4/search"
+            url = self.endpoints["gnews"]
             params = {
                 "q": query,
                 "token": self.api_keys["gnews"],
@@ -50,7 +123,7 @@ class MultiSourceSearcher:
                 "sortby": "relevance"
             }
 
-            res = requests.get(url, params=params, timeout=10)
+            res = self.session.get(url, params=params, timeout=10)
             data = res.json().get("articles", [])
 
             return [{
@@ -62,13 +135,14 @@ class MultiSourceSearcher:
                 "content": a.get("content", "")
             } for a in data]
 
-        except:
+        except Exception as e:
+            self.metrics.incr("failures", stage="search", reason=f"gnews:{type(e).__name__}")
             return []
 
     # ----------------- NEWSAPI --------------------
     def _search_newsapi(self, query: str, limit: int) -> List[Dict]:
         try:
-            url = "https://newsapi.org/v2/everything"
+            url = self.endpoints["newsapi"]
             params = {
                 "q": query,
                 "apiKey": self.api_keys["newsapi"],
@@ -77,7 +151,7 @@ class MultiSourceSearcher:
                 "pageSize": limit,
             }
 
-            res = requests.get(url, params=params, timeout=10)
+            res = self.session.get(url, params=params, timeout=10)
             data = res.json().get("articles", [])
 
             return [{
@@ -89,17 +163,18 @@ class MultiSourceSearcher:
                 "content": a.get("content", "")
             } for a in data]
 
-        except:
+        except Exception as e:
+            self.metrics.incr("failures", stage="search", reason=f"newsapi:{type(e).__name__}")
             return []
 
     # ----------------- BING NEWS --------------------
     def _search_bing(self, query: str, limit: int) -> List[Dict]:
         try:
-            url = "https://api.bing.microsoft.com/v7.0/news/search"
+            url = self.endpoints["bing"]
             headers = {"Ocp-Apim-Subscription-Key": self.api_keys["bing"]}
             params = {"q": query, "count": limit, "mkt": "en-US"}
 
-            res = requests.get(url, headers=headers, params=params, timeout=10)
+            res = self.session.get(url, headers=headers, params=params, timeout=10)
             data = res.json().get("value", [])
 
             return [{
@@ -111,7 +186,8 @@ class MultiSourceSearcher:
                 "content": "",
             } for a in data]
 
-        except:
+        except Exception as e:
+            self.metrics.incr("failures", stage="search", reason=f"bing:{type(e).__name__}")
             return []
 
     # ----------------- HELPERS --------------------
@@ -128,7 +204,6 @@ class MultiSourceSearcher:
 
     def _add_reliability(self, results: List[Dict]) -> List[Dict]:
         for r in results:
-            src = r["source"].lower()
-            r["reliability"] = self.source_reliability.get(src, 0.60)
+            r["reliability"] = self.reliability.lookup(r["source"], r.get("url"))
 
         return results
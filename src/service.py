@@ -0,0 +1,214 @@
+"""HTTP service mode: one warm HybridFakeNewsDetector per worker process, served over ASGI.
+
+    uvicorn service:app --app-dir src --host 0.0.0.0 --port 8000 --workers 4
+
+Endpoints:
+    POST /detect        {"claim": "...", "max_sources": 10}
+    POST /detect/batch  {"claims": ["...", ...], "max_sources": 10}
+    GET  /health
+    GET  /metrics       Prometheus text format
+
+Configuration is read from the environment: FAKENEWS_GNEWS_KEY, FAKENEWS_NEWSAPI_KEY,
+FAKENEWS_BING_KEY, FAKENEWS_CACHE_DIR, FAKENEWS_EVIDENCE_STORE, FAKENEWS_EVIDENCE_MODE,
+FAKENEWS_VERDICT_TTL, FAKENEWS_EARLY_EXIT, FAKENEWS_PROCESSES, FAKENEWS_EMBEDDING_BACKEND, FAKENEWS_THREADS, FAKENEWS_MAX_QUEUE, FAKENEWS_TIMEOUT, FAKENEWS_MAX_BATCH,
+FAKENEWS_SEARCH_CACHE_TTL and FAKENEWS_RATE_LIMITS (per-provider requests/second and burst, e.g.
+"gnews=0.5:5,newsapi=1:10"; limits apply per worker process).
+"""
+import os
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from search_cache import normalize_query
+
+MAX_BODY = 1 << 20
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.headers = list(headers)
+
+def _env_api_keys():
+    keys = {name: os.environ.get(f"FAKENEWS_{name.upper()}_KEY") for name in ("gnews", "newsapi", "bing")}
+    return {name: key for name, key in keys.items() if key}
+
+def _env_rate_limits():
+    limits = {}
+    for item in filter(None, os.environ.get("FAKENEWS_RATE_LIMITS", "").replace(" ", "").split(",")):
+        try:
+            name, spec = item.split("=")
+            rate, burst = spec.split(":")
+            limits[name] = (float(rate), int(burst))
+        except ValueError:
+            raise ValueError(f"FAKENEWS_RATE_LIMITS entries look like provider=rate:burst, got {item!r}")
+    return limits or None
+
+def _create_detector():
+    from detector import HybridFakeNewsDetector
+    return HybridFakeNewsDetector(api_keys=_env_api_keys(),
+                                  cache_dir=os.environ.get("FAKENEWS_CACHE_DIR"),
+                                  evidence_store=os.environ.get("FAKENEWS_EVIDENCE_STORE"),
+                                  evidence_mode=os.environ.get("FAKENEWS_EVIDENCE_MODE", "live"),
+                                  verdict_ttl=float(os.environ.get("FAKENEWS_VERDICT_TTL", 3600)) or None,
+                                  early_exit=os.environ.get("FAKENEWS_EARLY_EXIT", "1") == "1",
+                                  processes=int(os.environ.get("FAKENEWS_PROCESSES", 0)),
+                                  embedding_backend=os.environ.get("FAKENEWS_EMBEDDING_BACKEND", "torch"),
+                                  search_rate_limits=_env_rate_limits(),
+                                  search_cache_ttl=float(os.environ.get("FAKENEWS_SEARCH_CACHE_TTL", 900)),
+                                  tracing=True)
+
+class DetectorService:
+    """ASGI app with backpressure, per-request timeouts and coalescing of identical in-flight claims.
+
+    Pipeline runs execute on a thread pool of `threads`; at most `max_queue` more may wait for a
+    thread before new work is rejected with 503. Requests for a claim that is already running
+    join that run instead of starting another, so they never count against the queue.
+    """
+
+    def __init__(self, detector=None, threads=None, max_queue=None, timeout=None, max_batch=None):
+        self.detector = detector
+        self.threads = threads or int(os.environ.get("FAKENEWS_THREADS", 4))
+        self.max_queue = max_queue if max_queue is not None else int(os.environ.get("FAKENEWS_MAX_QUEUE", 32))
+        self.timeout = timeout or float(os.environ.get("FAKENEWS_TIMEOUT", 60))
+        self.max_batch = max_batch or int(os.environ.get("FAKENEWS_MAX_BATCH", 64))
+        self._pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="detect")
+        self._inflight = {}
+        self._pending = 0
+        self._start_lock = None
+
+    # ----------------- LIFECYCLE --------------------
+    async def startup(self):
+        if self._start_lock is None: self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self.detector is None:
+                loop = asyncio.get_running_loop()
+                detector = await loop.run_in_executor(self._pool, _create_detector)
+                await loop.run_in_executor(self._pool, detector.warmup)
+                self.detector = detector
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        if self.detector is not None and "fetcher" in self.detector._components:
+            self.detector.fetcher.close()
+
+    # ----------------- SCHEDULING --------------------
+    async def _run(self, fn, *args):
+        """Run fn on the pool, rejecting with 503 once every thread is busy and the queue is full"""
+        if self._pending >= self.threads + self.max_queue:
+            self.detector.metrics.incr("requests", outcome="rejected")
+            raise HTTPError(503, "Server busy, retry later", [(b"retry-after", b"1")])
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def _coalesced(self, key, fn, *args):
+        """Share one pipeline run between every concurrent request with the same key"""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.detector.metrics.incr("requests", outcome="coalesced")
+        else:
+            future = self._inflight[key] = asyncio.ensure_future(self._run(fn, *args))
+            future.add_done_callback(lambda f: self._inflight.pop(key, None))
+        # shield: a waiter timing out must not cancel the run the others are waiting on
+        return await asyncio.shield(future)
+
+    async def _with_timeout(self, awaitable):
+        try:
+            return await asyncio.wait_for(awaitable, self.timeout)
+        except asyncio.TimeoutError:
+            self.detector.metrics.incr("requests", outcome="timeout")
+            raise HTTPError(504, f"Detection did not finish within {self.timeout:g}s")
+
+    # ----------------- ENDPOINTS --------------------
+    def _max_sources(self, body):
+        max_sources = body.get("max_sources", 10)
+        if not isinstance(max_sources, int) or not 1 <= max_sources <= 50:
+            raise HTTPError(400, "max_sources must be an integer between 1 and 50")
+        return max_sources
+
+    async def detect(self, body):
+        claim = body.get("claim")
+        if not isinstance(claim, str) or not claim.strip():
+            raise HTTPError(400, "Body must contain a non-empty 'claim' string")
+        max_sources = self._max_sources(body)
+        result = await self._with_timeout(self._coalesced((normalize_query(claim), max_sources),
+                                                          self.detector.detect, claim, max_sources))
+        self.detector.metrics.incr("requests", outcome="ok", endpoint="detect")
+        return result
+
+    async def detect_batch(self, body):
+        claims = body.get("claims")
+        if not isinstance(claims, list) or not all(isinstance(c, str) for c in claims):
+            raise HTTPError(400, "Body must contain a 'claims' list of strings")
+        if len(claims) > self.max_batch:
+            raise HTTPError(413, f"At most {self.max_batch} claims per batch")
+        if not claims: return {"results": []}
+        results = await self._with_timeout(self._run(self.detector.detect_batch, claims, self._max_sources(body)))
+        self.detector.metrics.incr("requests", outcome="ok", endpoint="detect_batch")
+        return {"results": results}
+
+    def health(self):
+        return {"status": "ok", "inflight": len(self._inflight), "pending": self._pending,
+                "capacity": self.threads + self.max_queue, **self.detector.health()}
+
+    # ----------------- ASGI --------------------
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] != "http": return
+
+        try:
+            if self.detector is None: await self.startup()
+            route = (scope["method"], scope["path"].rstrip("/") or "/")
+            if route == ("GET", "/health"):
+                return await self._send_json(send, 200, self.health())
+            if route == ("GET", "/metrics"):
+                return await self._send(send, 200, self.detector.metrics.to_prometheus().encode(),
+                                        b"text/plain; version=0.0.4; charset=utf-8")
+            handler = {("POST", "/detect"): self.detect, ("POST", "/detect/batch"): self.detect_batch}.get(route)
+            if handler is None:
+                raise HTTPError(404, "Not found")
+            await self._send_json(send, 200, await handler(await self._read_json(receive)))
+        except HTTPError as e:
+            await self._send_json(send, e.status, {"error": str(e)}, e.headers)
+        except Exception as e:
+            await self._send_json(send, 500, {"error": f"{type(e).__name__}: {e}"})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)}); return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"}); return
+
+    async def _read_json(self, receive):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if len(body) > MAX_BODY: raise HTTPError(413, "Request body too large")
+            if not message.get("more_body"): break
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Body must be valid JSON")
+        if not isinstance(data, dict): raise HTTPError(400, "Body must be a JSON object")
+        return data
+
+    async def _send_json(self, send, status, data, headers=()):
+        await self._send(send, status, json.dumps(data, default=str).encode(), b"application/json", headers)
+
+    async def _send(self, send, status, body, content_type, headers=()):
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode()), *headers]})
+        await send({"type": "http.response.body", "body": body})
+
+app = DetectorService()
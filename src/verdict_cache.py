@@ -0,0 +1,176 @@
+import re
+import copy
+import time
+import hashlib
+import threading
+import unicodedata
+import numpy as np
+from collections import OrderedDict
+from search_cache import normalize_query
+
+NEGATIONS = {"not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "without",
+             "false", "fake", "hoax", "deny", "denies", "denied", "debunked", "isn't", "aren't", "wasn't",
+             "weren't", "doesn't", "didn't", "don't", "won't", "can't", "cannot", "hasn't", "haven't"}
+# Function words that paraphrases add or drop freely
+STOPWORDS = {"a", "an", "the", "is", "are", "was", "were", "be", "been", "being", "has", "have", "had",
+             "do", "does", "did", "will", "that", "which", "who", "this", "of", "it", "its", "on", "in",
+             "at", "by", "for", "with", "and"}
+_SUFFIXES = ("ing", "ed", "es", "s", "y")
+_PRIME = (1 << 31) - 1
+
+def _tokens(claim):
+    return re.findall(r"[\w']+", normalize_query(claim))
+
+def _stem(token):
+    # Crude suffix stripping, enough to equate "confirms"/"confirmed" and "discovered"/"discovery"
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4: return token[:-len(suffix)]
+    return token
+
+def _content(tokens):
+    return frozenset(_stem(t) for t in tokens if t not in STOPWORDS) or frozenset(tokens)
+
+def _entities(claim):
+    """Capitalized content words in order of first appearance, or None if the claim has no case to go by"""
+    if claim.islower() or claim.isupper(): return None
+    words = re.findall(r"[\w']+", unicodedata.normalize("NFKC", claim))
+    entities = [w.casefold() for w in words if w[0].isupper() and w.casefold() not in STOPWORDS]
+    return tuple(dict.fromkeys(entities))
+
+def _text(claim):
+    return re.sub(r'\s+', ' ', claim).strip()
+
+class VerdictCache:
+    """TTL + LRU cache of detect() results that also answers for near-duplicate claims.
+
+    Claims are reduced to stemmed content words (STOPWORDS dropped); MinHash signatures over them,
+    split into LSH bands, find candidates. A candidate matches when:
+      - one claim's content words are a subset of the other's (words may be added, never swapped),
+      - their Jaccard similarity reaches `threshold`,
+      - their capitalized words (entities) appear in the same order ("Paris ... France" never
+        answers for "Berlin ... France", "Trump beat Biden" never for "Biden beat Trump"),
+      - their numbers and negation polarity agree ("rates rose 2%" vs "3%", "safe" vs "not safe").
+    Only a claim whose text is identical is an "exact" hit; anything else is a "near_duplicate".
+    """
+
+    def __init__(self, threshold=0.8, ttl=3600, capacity=10000, num_perm=64, bands=16, seed=1):
+        if num_perm % bands: raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.ttl = ttl
+        self.capacity = capacity
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)
+        self._entries = OrderedDict()
+        self._exact = {}
+        self._buckets = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _signature(self, shingles):
+        hashes = np.array([int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little") % _PRIME
+                           for s in shingles], dtype=np.uint64)
+        return ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0)
+
+    def _band_keys(self, signature, scope):
+        return [(scope, band, signature[band*self.rows:(band+1)*self.rows].tobytes()) for band in range(self.bands)]
+
+    def _guard(self, tokens):
+        return (frozenset(t for t in tokens if any(ch.isdigit() for ch in t)),
+                sum(t in NEGATIONS or t.endswith("n't") for t in tokens) % 2)
+
+    def _remove(self, entry_id):
+        entry = self._entries.pop(entry_id)
+        if self._exact.get((entry["scope"], entry["key"])) == entry_id: del self._exact[(entry["scope"], entry["key"])]
+        for band_key in entry["bands"]:
+            bucket = self._buckets.get(band_key)
+            if bucket is None: continue
+            bucket.discard(entry_id)
+            if not bucket: del self._buckets[band_key]
+
+    def get(self, claim, scope=None):
+        """Cached result for claim or a near-duplicate (deep copy with a 'cache' provenance block), else None"""
+        tokens = _tokens(claim)
+        if not tokens: return None
+        key = " ".join(tokens)
+        now = time.monotonic()
+        with self._lock:
+            entry_id = self._exact.get((scope, key))
+            similarity = 1.0
+            if entry_id is None:
+                content = _content(tokens)
+                guard = self._guard(tokens)
+                entities = _entities(claim)
+                candidates = set()
+                for band_key in self._band_keys(self._signature(content), scope):
+                    candidates |= self._buckets.get(band_key, set())
+                best = None
+                for cand in candidates:
+                    entry = self._entries[cand]
+                    if entry["guard"] != guard or now - entry["stored_at"] > self.ttl: continue
+                    if not (content <= entry["content"] or entry["content"] <= content): continue
+                    if entities is not None and entry["entities"] is not None and entities != entry["entities"]: continue
+                    jaccard = len(content & entry["content"]) / len(content | entry["content"])
+                    if jaccard >= self.threshold and (best is None or jaccard > best[1]): best = (cand, jaccard)
+                if best is None: return None
+                entry_id, similarity = best
+            entry = self._entries[entry_id]
+            if now - entry["stored_at"] > self.ttl:
+                self._remove(entry_id); return None
+            self._entries.move_to_end(entry_id)
+
+        result = copy.deepcopy(entry["result"])
+        claim = _text(claim)
+        # Punctuation and case are dropped from the key but not from style analysis, so only identical text is exact
+        result["cache"] = {"hit": "exact" if claim == entry["claim"] else "near_duplicate",
+                           "matched_claim": entry["claim"], "similarity": similarity,
+                           "age": now - entry["stored_at"]}
+        result["claim"] = claim
+        return result
+
+    def put(self, claim, result, scope=None):
+        tokens = _tokens(claim)
+        if not tokens: return
+        key = " ".join(tokens)
+        content = _content(tokens)
+        bands = self._band_keys(self._signature(content), scope)
+        stored = copy.deepcopy({k: v for k, v in result.items() if k not in ("timings", "cache")})
+        with self._lock:
+            if (scope, key) in self._exact: self._remove(self._exact[(scope, key)])
+            entry_id = self._next_id; self._next_id += 1
+            self._entries[entry_id] = {"claim": _text(result.get("claim", claim)), "key": key, "scope": scope,
+                                       "content": content, "entities": _entities(result.get("claim", claim)),
+                                       "guard": self._guard(tokens), "bands": bands, "result": stored, "stored_at": time.monotonic()}
+            self._exact[(scope, key)] = entry_id
+            for band_key in bands: self._buckets.setdefault(band_key, set()).add(entry_id)
+            while len(self._entries) > self.capacity:
+                self._remove(next(iter(self._entries)))
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# SELF-CHECK
+if __name__ == "__main__":
+    cache = VerdictCache()
+    for stored in ("Paris is the capital of France", "Biden won the presidential election in Georgia",
+                   "NASA confirms alien life discovered on Mars", "Flights from London to Paris were cancelled",
+                   "Trump beat Biden in Georgia"):
+        cache.put(stored, {"claim": stored, "verdict": "TRUE", "style_features": {}})
+    hits = ["NASA confirms alien life was discovered on Mars!", "nasa confirms alien life discovered on mars",
+            "NASA has confirmed alien life discovered on Mars", "NASA confirms discovery of alien life on Mars",
+            "NASA officially confirms alien life discovered on Mars"]
+    misses = ["Paris is the capital of Germany", "Berlin is the capital of France",
+              "Trump won the presidential election in Georgia", "Biden lost the presidential election in Georgia",
+              "Biden won the presidential election in Arizona", "NASA denies alien life discovered on Mars",
+              "Flights from Paris to London were cancelled", "NASA confirms alien life not discovered on Mars",
+              "Biden beat Trump in Georgia", "paris is the capital of germany", "NASA confirms alien life discovered on Venus"]
+    for claim in hits:
+        result = cache.get(claim)
+        assert result and result["cache"]["hit"] == "near_duplicate", claim
+    assert cache.get("Paris is the capital of France")["cache"]["hit"] == "exact"
+    for claim in misses:
+        assert cache.get(claim) is None, claim
+    print(f"✓ Verdict cache: {len(hits)} paraphrases matched, {len(misses)} swapped/negated claims rejected")
@@ -1,24 +1,73 @@
-import re, numpy as np
-from sentence_transformers import SentenceTransformer
+import os, re, numpy as np
+from embedding_cache import EmbeddingCache
+from embedding_backends import load_backend, DEFAULT_MODEL
+from metrics import NULL_METRICS
 
 class RAGNLIVerifier:
-    def __init__(self):
-        print("Loading embedding model (MiniLM, ~80MB)...")
-        self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
-        print("✓ RAG verifier ready")
+    def __init__(self, batch_size=256, top_k=3, cache_dir=None, cache_items=50000, metrics=NULL_METRICS, offload=None,
+                 backend="torch", model_name=DEFAULT_MODEL):
+        # backend: "torch" (fp32 reference), "torch-int8", "onnx-int8", "onnx" or an EmbeddingBackend.
+        # With an offload pool the model lives only in the worker processes, which already loaded it
+        if offload is not None and offload.dim:
+            self.embedder = offload
+        else:
+            label = backend.name if hasattr(backend, "name") else backend
+            print(f"Loading embedding model ({getattr(backend, 'model_name', model_name)}, {label} backend)...")
+            self.embedder = load_backend(backend, model_name)
+        self.model_name = self.embedder.model_name
+        self.batch_size = batch_size
+        self.top_k = top_k
+        self.metrics = metrics
+        self.offload = offload  # executor.ProcessOffload: run encodes in worker processes
+        self.cache = EmbeddingCache(self.embedder.cache_name, self.embedder.dim,
+                                    cache_dir=cache_dir and os.path.join(cache_dir, "embeddings"), memory_items=cache_items)
+        print(f"✓ RAG verifier ready ({self.model_name}, {self.embedder.name} backend"
+              f"{', in worker processes' if self.embedder is offload else ''})")
+
+    def split_sentences(self, evidence):
+        """Sentences of a document that are long enough to embed as evidence (at most 50)"""
+        return [s.strip() for s in re.split(r'[.!?]+', evidence) if len(s.split())>5][:50]
+
+    def embed(self, texts):
+        """L2-normalized embeddings (cached) for a list of texts"""
+        return self._encode(texts)
+
+    def _encode(self, texts):
+        return self.cache.encode(texts, self._encode_uncached)
+
+    def _encode_uncached(self, texts):
+        with self.metrics.timer("stage", stage="embed"):
+            if self.offload is not None: return self.offload.encode(texts)
+            return self.embedder.encode(texts, batch_size=self.batch_size)
 
     def verify(self, claim, evidence):
-        sentences = [s.strip() for s in re.split(r'[.!?]+', evidence) if len(s.split())>5]
-        if not sentences: return {'verdict':'no_evidence','confidence':0.0,'snippet':''}
-
-        claim_emb=self.embedder.encode([claim])[0]
-        sent_embs=self.embedder.encode(sentences[:50])
-        similarities=[np.dot(claim_emb,sent_emb)/(np.linalg.norm(claim_emb)*np.linalg.norm(sent_emb)) for sent_emb in sent_embs]
-        best_idx=np.argmax(similarities)
-        best_sim=float(similarities[best_idx])
-        best_sent=sentences[best_idx]
-        verdict, confidence=self._analyze(claim,best_sent,best_sim)
-        return {'verdict':verdict,'confidence':confidence,'similarity':best_sim,'snippet':best_sent}
+        return self.verify_batch(claim, [evidence])[0]
+
+    def verify_batch(self, claim, documents):
+        """Verify a claim against many documents with one claim encode and one similarity matmul"""
+        doc_sentences = [self.split_sentences(doc or '') for doc in documents]
+        all_sentences = [s for sents in doc_sentences for s in sents]
+        if not all_sentences:
+            return [{'verdict':'no_evidence','confidence':0.0,'snippet':''} for _ in documents]
+
+        claim_emb = self._encode([claim])[0]
+        sent_embs = self._encode(all_sentences)
+        similarities = sent_embs @ claim_emb
+
+        results = []; offset = 0
+        for sents in doc_sentences:
+            if not sents:
+                results.append({'verdict':'no_evidence','confidence':0.0,'snippet':''}); continue
+            sims = similarities[offset:offset+len(sents)]; offset += len(sents)
+            k = min(self.top_k, len(sents))
+            top = np.argpartition(-sims, k-1)[:k]
+            top = top[np.argsort(-sims[top])]
+            best_sim = float(sims[top[0]])
+            best_sent = sents[top[0]]
+            verdict, confidence = self._analyze(claim, best_sent, best_sim)
+            results.append({'verdict':verdict,'confidence':confidence,'similarity':best_sim,'snippet':best_sent,
+                            'top_k':[(sents[i], float(sims[i])) for i in top]})
+        return results
 
     def _analyze(self, claim, sentence, similarity):
         sent_lower=sentence.lower()